@@ -7,15 +7,20 @@ Flask server for live image/video processing
 import os
 import sys
 import json
+import time
+import zipfile
 import tempfile
-from flask import Flask, request, jsonify, send_file
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import cv2
+import numpy as np
 
 # Add parent directory to path to import othello_cv
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from othello_cv import OthelloCV
+from othello_cv import OthelloCV, load_config
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -23,11 +28,21 @@ CORS(app)  # Enable CORS for all routes
 # Configuration
 UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'mp4', 'mov', 'avi'}
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Bulk image processing
+MAX_BULK_IMAGES = 500
+MAX_BULK_TOTAL_SIZE = MAX_FILE_SIZE  # Decompressed bytes across all images
+BULK_WORKERS = int(os.environ.get('OTHELLO_CV_BULK_WORKERS', min(4, os.cpu_count() or 1)))
+
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+# Tuned OthelloCV parameters (e.g. written by othello_demo.py --autotune)
+CV_CONFIG_PATH = os.environ.get('OTHELLO_CV_CONFIG')
+CV_PARAMS = load_config(CV_CONFIG_PATH) if CV_CONFIG_PATH else {}
+
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -41,6 +56,107 @@ def is_video(filename):
     return ext in {'mp4', 'mov', 'avi'}
 
 
+def is_image(filename):
+    """Check if file is an image"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in IMAGE_EXTENSIONS
+
+
+# One worker pool shared by all bulk requests, so concurrent requests queue
+# instead of adding threads
+_bulk_executor = ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix='othello-bulk')
+
+# One OthelloCV per bulk worker thread (its fingerprint memo is not thread-safe);
+# the threads outlive requests, so processors and memos are reused
+_thread_state = threading.local()
+
+
+def get_thread_processor(board_size):
+    """Return this thread's OthelloCV for a board size"""
+    processors = getattr(_thread_state, 'processors', None)
+    if processors is None:
+        processors = _thread_state.processors = {}
+    if board_size not in processors:
+        processors[board_size] = OthelloCV(board_size=board_size, **CV_PARAMS)
+    return processors[board_size]
+
+
+def read_bulk_images(files):
+    """
+    Collect (filename, bytes) pairs from uploaded images and zip archives
+
+    Archive members are counted and their declared sizes summed before any
+    member is decompressed, so the request is rejected up front when it
+    would exceed MAX_BULK_IMAGES or MAX_BULK_TOTAL_SIZE.
+
+    Raises:
+        ValueError: If an upload is not an image or zip, the archive is
+            invalid, or the request exceeds the bulk limits
+    """
+    images = []
+    total_size = 0
+
+    def check_limits(count, size):
+        if count > MAX_BULK_IMAGES:
+            raise ValueError(f'Too many images. Maximum is {MAX_BULK_IMAGES} per request')
+        if size > MAX_BULK_TOTAL_SIZE:
+            raise ValueError('Images too large. Maximum is 50MB uncompressed per request')
+
+    for file in files:
+        filename = file.filename or ''
+        if filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file.stream) as archive:
+                    members = [
+                        info for info in archive.infolist()
+                        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                        and is_image(info.filename)
+                    ]
+                    total_size += sum(info.file_size for info in members)
+                    check_limits(len(images) + len(members), total_size)
+
+                    # zipfile stops reading at each member's declared size
+                    for info in members:
+                        images.append((info.filename, archive.read(info)))
+            except zipfile.BadZipFile:
+                raise ValueError(f'{filename} is not a valid zip archive')
+        elif is_image(filename):
+            data = file.read()
+            total_size += len(data)
+            check_limits(len(images) + 1, total_size)
+            images.append((filename, data))
+        else:
+            raise ValueError(f'{filename} is not an image (png, jpg, jpeg) or zip archive')
+
+    return images
+
+
+def process_image_bytes(index, filename, data, board_size):
+    """Decode an image in memory and detect its board state"""
+    start_time = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    decode_time = time.perf_counter() - start_time
+    if image is None:
+        raise ValueError('Could not decode image')
+
+    cv_processor = get_thread_processor(board_size)
+    grid = cv_processor.process_frame(image)
+    state = cv_processor.grid_to_position_string(grid)
+
+    return {
+        'index': index,
+        'filename': filename,
+        'board_size': board_size,
+        'state': state,
+        'piece_count': {
+            'black': state.count('B'),
+            'white': state.count('W'),
+            'empty': state.count('-')
+        },
+        'decode_time': round(decode_time, 4),
+        'processing_time': round(time.perf_counter() - start_time, 4)
+    }
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -92,7 +208,7 @@ def process_upload():
         file.save(filepath)
 
         # Initialize Othello CV
-        cv_processor = OthelloCV(board_size=board_size)
+        cv_processor = OthelloCV(board_size=board_size, **CV_PARAMS)
 
         # Process based on file type
         is_vid = is_video(filename)
@@ -173,6 +289,68 @@ def process_upload():
         return jsonify({'error': f'Processing failed: {str(e)}'}), 500
 
 
+@app.route('/api/process/bulk', methods=['POST'])
+def process_bulk_upload():
+    """
+    Process many images in one request
+
+    Form data:
+        - files: Image files and/or zip archives of images (repeatable)
+        - board_size: 4 or 8 (default: 4)
+
+    Returns:
+        NDJSON stream with one result per image in completion order,
+        followed by a summary line
+    """
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    board_size = int(request.form.get('board_size', 4))
+    if board_size not in [4, 8]:
+        return jsonify({'error': 'board_size must be 4 or 8'}), 400
+
+    # Read everything up front; nothing touches the disk
+    try:
+        images = read_bulk_images(files)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not images:
+        return jsonify({'error': 'No images found in upload'}), 400
+
+    def generate():
+        start_time = time.perf_counter()
+        failed = 0
+        futures = {}
+        try:
+            futures = {
+                _bulk_executor.submit(process_image_bytes, index, filename, data, board_size): (index, filename)
+                for index, (filename, data) in enumerate(images)
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    index, filename = futures[future]
+                    result = {'index': index, 'filename': filename, 'error': f'Processing failed: {str(e)}'}
+                    failed += 1
+                yield json.dumps(result) + '\n'
+        finally:
+            # Drop this request's queued work if the client disconnects
+            for future in futures:
+                future.cancel()
+
+        yield json.dumps({
+            'done': True,
+            'total_images': len(images),
+            'failed': failed,
+            'processing_time': round(time.perf_counter() - start_time, 4)
+        }) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
 @app.route('/api/examples', methods=['GET'])
 def get_examples():
     """Get list of example boards"""
@@ -0,0 +1,245 @@
+"""
+Othello CV Parameter Autotuner
+==============================
+Sweeps OthelloCV parameters against a ground-truth move list and reports
+the Pareto front of accuracy vs processing speed.
+
+The video is decoded once into a FrameCache; every trial reads the same
+memory-mapped frames, so worker processes share the decoded data through
+the page cache instead of decoding the video again. Speeds are therefore
+cached-frame throughput (no decoding), and motion thresholds are in
+cached-frame pixels until autotune converts the chosen config back to the
+source resolution.
+"""
+
+import os
+import re
+import json
+import time
+import itertools
+import cv2
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from math import gcd
+from typing import Dict, List, Optional
+
+from othello_cv import OthelloCV, TUNABLE_PARAMETERS
+from othello_frame_cache import FrameCache
+
+
+# Default search space (motion_threshold counts thresholded pixels x 255)
+DEFAULT_GRID = {
+    'skip_frames': [10, 20, 40],
+    'motion_threshold': [10, 255 * 10, 255 * 100],
+    'color_threshold': [0.2, 0.3, 0.4],
+    'resize_width': [250, 500],
+}
+
+# Frame cache shared by the trials in a worker process
+_worker_cache = None
+
+
+def load_ground_truth(path: str, board_size: int) -> List[str]:
+    """
+    Load the expected sequence of board states.
+
+    Accepts a JSON result from othello_demo.py (with "moves"), a JSON list
+    of move dictionaries or state strings, or a text file with one state
+    per line (such as the *_moves.txt output).
+
+    Args:
+        path: Path to the ground-truth file
+        board_size: Board dimensions, used to find states in text files
+
+    Returns:
+        List of position strings
+    """
+    with open(path) as f:
+        content = f.read()
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        pattern = re.compile(r'(?<![\w-])([BW-]{%d})(?![\w-])' % (board_size * board_size))
+        return [match.group(1) for match in map(pattern.search, content.splitlines()) if match]
+
+    if isinstance(data, dict):
+        data = data['moves']
+    return [move['state'] if isinstance(move, dict) else move for move in data]
+
+
+def move_accuracy(detected: List[str], expected: List[str]) -> float:
+    """
+    Score a detected state sequence against the expected one.
+
+    Uses 1 - (edit distance / longer length), so missed, spurious and
+    wrong states all reduce the score.
+
+    Args:
+        detected: Detected position strings
+        expected: Ground-truth position strings
+
+    Returns:
+        Accuracy between 0 and 1
+    """
+    if not detected and not expected:
+        return 1.0
+
+    previous = list(range(len(expected) + 1))
+    for i, state in enumerate(detected, 1):
+        current = [i]
+        for j, truth in enumerate(expected, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (state != truth)
+            ))
+        previous = current
+
+    return 1.0 - previous[-1] / max(len(detected), len(expected))
+
+
+def pareto_front(trials: List[Dict]) -> List[Dict]:
+    """
+    Select trials not dominated in both accuracy and cached frames per second.
+
+    Args:
+        trials: Trial results with "accuracy" and "cached_fps" keys
+
+    Returns:
+        Non-dominated trials, best accuracy first
+    """
+    front = []
+    for trial in trials:
+        dominated = any(
+            other['accuracy'] >= trial['accuracy'] and other['cached_fps'] >= trial['cached_fps'] and
+            (other['accuracy'] > trial['accuracy'] or other['cached_fps'] > trial['cached_fps'])
+            for other in trials
+        )
+        if not dominated:
+            front.append(trial)
+    return sorted(front, key=lambda t: (-t['accuracy'], -t['cached_fps']))
+
+
+def _init_worker(cache_dir: str) -> None:
+    """Open the shared frame cache once per worker process."""
+    global _worker_cache
+    _worker_cache = FrameCache(cache_dir)
+
+
+def _run_trial(job: Dict) -> Dict:
+    """Run one parameter combination against the shared frame cache."""
+    params = job['parameters']
+    processor = OthelloCV(board_size=job['board_size'], **params)
+
+    start_time = time.perf_counter()
+    result = processor.process_video(job['video_path'], frame_cache=_worker_cache)
+    elapsed = time.perf_counter() - start_time
+
+    detected = [move['state'] for move in result['moves']]
+    return {
+        "parameters": params,
+        "accuracy": round(move_accuracy(detected, job['expected']), 4),
+        # Frames per second read from the cache, excluding video decoding
+        "cached_fps": round(result['total_frames'] / max(elapsed, 1e-6), 1),
+        "total_moves": result['total_moves'],
+        "processing_time": round(elapsed, 3)
+    }
+
+
+def autotune(
+    video_path: str,
+    expected: List[str],
+    board_size: int = 4,
+    grid: Optional[Dict[str, List]] = None,
+    workers: Optional[int] = None,
+    cache_dir: Optional[str] = None
+) -> Dict:
+    """
+    Sweep the parameter grid in parallel and find the Pareto front.
+
+    Args:
+        video_path: Path to the video file
+        expected: Ground-truth position strings
+        board_size: Board dimensions (4 or 8)
+        grid: Values to try per parameter (default: DEFAULT_GRID)
+        workers: Worker processes (default: CPU count)
+        cache_dir: Frame cache directory (default: <video_path>.framecache)
+
+    Returns:
+        Dictionary with all trials, the Pareto front, the best trial and
+        "config": the best parameters with motion_threshold converted from
+        cached-frame pixels to source-resolution pixels, ready for
+        save_config
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    unknown = set(grid) - set(TUNABLE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters in grid: {', '.join(sorted(unknown))}")
+
+    # One cache serves every trial: its stride divides every skip value
+    # and its width covers the largest resize width
+    frame_cache = FrameCache.open(
+        video_path,
+        cache_dir=cache_dir,
+        width=max(grid['resize_width']),
+        stride=reduce(gcd, grid['skip_frames'])
+    )
+
+    names = list(grid)
+    jobs = [
+        {
+            "video_path": video_path,
+            "board_size": board_size,
+            "expected": expected,
+            "parameters": dict(zip(names, values))
+        }
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(frame_cache.cache_dir,)
+    ) as executor:
+        trials = list(executor.map(_run_trial, jobs))
+
+    front = pareto_front(trials)
+    motion_scale = source_motion_scale(video_path, frame_cache)
+    config = dict(front[0]['parameters'])
+    if 'motion_threshold' in config:
+        config['motion_threshold'] = int(round(config['motion_threshold'] * motion_scale))
+
+    return {
+        "video_path": video_path,
+        "board_size": board_size,
+        "total_trials": len(trials),
+        "trials": trials,
+        "pareto_front": front,
+        "best": front[0],
+        "motion_scale": round(motion_scale, 4),
+        "config": config
+    }
+
+
+def source_motion_scale(video_path: str, frame_cache: FrameCache) -> float:
+    """
+    Ratio of source to cached pixels per frame.
+
+    motion_threshold counts thresholded pixels, so a threshold tuned on
+    cached frames is multiplied by this to mean the same on full decodes.
+
+    Args:
+        video_path: Path to the source video
+        frame_cache: Cache the trials ran on
+
+    Returns:
+        Pixel ratio (1.0 when the cache was not downsampled)
+    """
+    cap = cv2.VideoCapture(video_path)
+    source_pixels = cap.get(cv2.CAP_PROP_FRAME_WIDTH) * cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    cap.release()
+    cached_pixels = frame_cache.frames.shape[1] * frame_cache.frames.shape[2]
+    if source_pixels <= 0:
+        return 1.0
+    return source_pixels / cached_pixels
@@ -0,0 +1,354 @@
+"""
+Othello Cell Classifier
+=======================
+Learned replacement for the per-cell colour-coverage rule in OthelloCV.
+
+Every cell of a batch of filtered board images is described by a small
+feature vector (white and black coverage ratios plus a per-channel colour
+histogram), extracted for the whole batch at once as a
+(frames, cells, features) array. A scikit-learn model then labels all
+cells of the batch in one predict call.
+
+Usage:
+    python othello_classifier.py train --labels docs/assets/data/test-results.json \\
+        --board-size 4 --output cell_classifier.pkl
+    python othello_demo.py --video input.mov --board-size 4 --classifier cell_classifier.pkl
+"""
+
+import os
+import sys
+import json
+import pickle
+import argparse
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from sklearn.ensemble import RandomForestClassifier
+
+from othello_records import states_to_codes, codes_to_grids
+
+
+MODEL_VERSION = 1
+
+# Histogram bins per colour channel
+HISTOGRAM_BINS = 8
+
+# Image the test suite labels in test-results.json (see test_demo.sh)
+DEFAULT_LABELLED_IMAGE = 'uploads/random-board-gamesman-uni.png'
+
+
+def extract_cell_features(
+    images: Sequence[np.ndarray],
+    board_size: int,
+    white_range: Tuple[np.ndarray, np.ndarray],
+    black_range: Tuple[np.ndarray, np.ndarray],
+    bins: int = HISTOGRAM_BINS
+) -> np.ndarray:
+    """
+    Extract per-cell features for a batch of board images.
+
+    Cells use the same geometry as OthelloCV.process_frame and are ordered
+    row-major (grid[row, col]).
+
+    Args:
+        images: Filtered BGR board images
+        board_size: Board dimensions
+        white_range: Lower and upper BGR bounds of white pieces
+        black_range: Lower and upper BGR bounds of black pieces
+        bins: Histogram bins per channel (must divide 256)
+
+    Returns:
+        Features (frames, cells, 2 + 3 * bins): white coverage, black
+        coverage, then the normalized B, G and R histograms
+    """
+    features = np.empty((len(images), board_size * board_size, 2 + 3 * bins), dtype=np.float32)
+
+    # Images of the same size are processed together
+    by_shape = {}
+    for i, image in enumerate(images):
+        by_shape.setdefault(image.shape, []).append(i)
+
+    for (img_h, img_w, _), indices in by_shape.items():
+        cell_h, cell_w = img_h // board_size, img_w // board_size
+        batch = np.stack([images[i] for i in indices])[:, :cell_h * board_size, :cell_w * board_size]
+
+        # (frames, cells, pixels, channels)
+        cells = batch.reshape(len(indices), board_size, cell_h, board_size, cell_w, 3)
+        cells = cells.transpose(0, 1, 3, 2, 4, 5).reshape(len(indices), board_size * board_size, -1, 3)
+        pixels = cells.shape[2]
+
+        white = np.all((cells >= white_range[0]) & (cells <= white_range[1]), axis=3).mean(axis=2)
+        black = np.all((cells >= black_range[0]) & (cells <= black_range[1]), axis=3).mean(axis=2)
+
+        # One bincount for every (frame, cell, channel) histogram
+        offsets = np.arange(len(indices) * board_size * board_size * 3).reshape(
+            len(indices), board_size * board_size, 1, 3) * bins
+        binned = (cells // (256 // bins)).astype(np.int64) + offsets
+        histograms = np.bincount(binned.ravel(), minlength=offsets.size * bins)
+        histograms = histograms.reshape(len(indices), board_size * board_size, 3 * bins) / pixels
+
+        features[indices, :, 0] = white
+        features[indices, :, 1] = black
+        features[indices, :, 2:] = histograms
+
+    return features
+
+
+class CellClassifier:
+    """
+    Batched cell classifier backed by a scikit-learn model.
+
+    Labels follow OthelloCV grids: 1 = black, -1 = white, 0 = empty.
+    """
+
+    def __init__(
+        self,
+        board_size: int,
+        white_range: Tuple[np.ndarray, np.ndarray],
+        black_range: Tuple[np.ndarray, np.ndarray],
+        model=None
+    ):
+        """
+        Create an untrained classifier (see fit) or wrap a trained model.
+
+        Args:
+            board_size: Board dimensions (4 or 8)
+            white_range: Lower and upper BGR bounds of white pieces
+            black_range: Lower and upper BGR bounds of black pieces
+            model: Trained scikit-learn classifier (default: a new random forest)
+        """
+        self.board_size = board_size
+        self.white_range = tuple(np.asarray(bound) for bound in white_range)
+        self.black_range = tuple(np.asarray(bound) for bound in black_range)
+        self.model = model or RandomForestClassifier(
+            n_estimators=50, class_weight='balanced', random_state=0
+        )
+
+    def extract_features(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """Extract (frames, cells, features) for filtered board images."""
+        return extract_cell_features(images, self.board_size, self.white_range, self.black_range)
+
+    def fit(self, images: Sequence[np.ndarray], grids: np.ndarray) -> 'CellClassifier':
+        """
+        Train on filtered board images and their grids.
+
+        Args:
+            images: Filtered BGR board images
+            grids: Board grids (frames, rows, cols)
+
+        Returns:
+            self
+        """
+        features = self.extract_features(images)
+        self.model.fit(features.reshape(-1, features.shape[2]), np.asarray(grids).reshape(-1))
+        return self
+
+    def predict(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Classify every cell of a batch with one predict call.
+
+        Args:
+            images: Filtered BGR board images
+
+        Returns:
+            Board grids (frames, rows, cols)
+        """
+        features = self.extract_features(images)
+        labels = self.model.predict(features.reshape(-1, features.shape[2]))
+        return labels.astype(int).reshape(len(images), self.board_size, self.board_size)
+
+    def save(self, path: str) -> None:
+        """Save the trained classifier."""
+        with open(path, 'wb') as f:
+            pickle.dump({
+                "version": MODEL_VERSION,
+                "board_size": self.board_size,
+                "white_range": [bound.tolist() for bound in self.white_range],
+                "black_range": [bound.tolist() for bound in self.black_range],
+                "model": self.model
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'CellClassifier':
+        """
+        Load a classifier written by save.
+
+        Only load model files you trust: they are unpickled.
+        """
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get('version') != MODEL_VERSION:
+            raise ValueError(f"Unsupported classifier file: {path}")
+        return cls(data['board_size'], data['white_range'], data['black_range'], model=data['model'])
+
+
+def load_labels(
+    path: str,
+    board_size: int,
+    image: Optional[str] = None
+) -> List[Tuple[str, Optional[int], str]]:
+    """
+    Load labelled board states and the media they were seen in.
+
+    Accepts:
+        - test-results.json: states of the image tests are paired with
+          `image`. Its sample moves are not used: their frame numbers come
+          from a video that is not shipped with the repo
+        - a JSON result from othello_demo.py (video or image)
+        - a JSON list of {"source", "frame", "state"} entries
+
+    Args:
+        path: Labels file
+        board_size: Board dimensions; states of other sizes are ignored
+        image: Image labelled by test-results.json (default: DEFAULT_LABELLED_IMAGE)
+
+    Returns:
+        List of (source path, frame number or None for images, state)
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        labels = [(entry['source'], entry.get('frame'), entry['state']) for entry in data]
+    elif 'tests' in data:
+        image = image or DEFAULT_LABELLED_IMAGE
+        states = {test['board_state'] for test in data['tests'] if 'board_state' in test}
+        labels = [(image, None, state) for state in sorted(states)]
+    elif 'moves' in data:
+        labels = [(data['video_path'], move['frame'], move['state']) for move in data['moves']]
+    else:
+        labels = [(data['image_path'], None, data['state'])]
+
+    # Sources in result files may be relative to where they were produced
+    base_dir = os.path.dirname(os.path.abspath(path))
+    labels = [
+        (source if os.path.exists(source) else os.path.join(base_dir, source), frame, state)
+        for source, frame, state in labels
+    ]
+    return [label for label in labels if len(label[2]) == board_size * board_size]
+
+
+def read_labelled_frames(labels: List[Tuple[str, Optional[int], str]]) -> Tuple[List[np.ndarray], List[str]]:
+    """
+    Read the frames named by load_labels.
+
+    Video frame numbers follow process_video, which counts from the frame
+    after the motion reference. Missing sources are skipped with a warning.
+
+    Returns:
+        Tuple of (BGR frames, states)
+    """
+    frames, states = [], []
+    captures = {}
+    try:
+        for source, frame_number, state in labels:
+            if not os.path.exists(source):
+                print(f"Warning: skipping missing source {source}", file=sys.stderr)
+                continue
+
+            if frame_number is None:
+                frame = cv2.imread(source)
+            else:
+                cap = captures.get(source) or captures.setdefault(source, cv2.VideoCapture(source))
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number + 1)
+                ret, frame = cap.read()
+                frame = frame if ret else None
+
+            if frame is None:
+                print(f"Warning: could not read {source} (frame {frame_number})", file=sys.stderr)
+                continue
+            frames.append(frame)
+            states.append(state)
+    finally:
+        for cap in captures.values():
+            cap.release()
+
+    return frames, states
+
+
+def train(
+    label_paths: List[str],
+    board_size: int,
+    output_path: str,
+    image: Optional[str] = None,
+    resize_width: int = 500
+) -> Dict:
+    """
+    Train a cell classifier and save it.
+
+    Args:
+        label_paths: Labels files (see load_labels)
+        board_size: Board dimensions (4 or 8)
+        output_path: Where to save the classifier
+        image: Image labelled by test-results.json
+        resize_width: Width frames are resized to, as in OthelloCV
+
+    Returns:
+        Training summary
+    """
+    from othello_cv import OthelloCV
+
+    labels = [label for path in label_paths for label in load_labels(path, board_size, image)]
+    frames, states = read_labelled_frames(labels)
+    if not frames:
+        raise ValueError("No labelled frames could be read")
+
+    processor = OthelloCV(board_size=board_size, resize_width=resize_width, frame_memo_size=0)
+    images = [processor.filter_frame(frame) for frame in frames]
+    grids = codes_to_grids(states_to_codes(states, board_size), board_size)
+
+    classifier = CellClassifier(
+        board_size,
+        (processor.WHITE_LOWER, processor.WHITE_UPPER),
+        (processor.BLACK_LOWER, processor.BLACK_UPPER)
+    )
+    classifier.fit(images, grids)
+    classifier.save(output_path)
+
+    rule_grids = np.stack([processor.process_frame(frame) for frame in frames])
+    return {
+        "frames": len(frames),
+        "cells": int(grids.size),
+        "cell_counts": {name: int(np.sum(grids == value)) for name, value in
+                        (("black", 1), ("white", -1), ("empty", 0))},
+        "train_accuracy": float(np.mean(classifier.predict(images) == grids)),
+        "rule_accuracy": float(np.mean(rule_grids == grids)),
+        "output": output_path
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Othello CV cell classifier')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subparsers.add_parser('train', help='Train a classifier from labelled states')
+    train_parser.add_argument('--labels', '-l', action='append', required=True,
+                              help='Labels file: test-results.json, an othello_demo.py JSON result, '
+                                   'or a list of {"source", "frame", "state"} (repeatable)')
+    train_parser.add_argument('--board-size', '-b', type=int, default=4, choices=[4, 8],
+                              help='Board size (4 or 8) [default: 4]')
+    train_parser.add_argument('--output', '-o', type=str, default='cell_classifier.pkl',
+                              help='Classifier file to write [default: cell_classifier.pkl]')
+    train_parser.add_argument('--image', type=str,
+                              help=f'Image labelled by test-results.json [default: {DEFAULT_LABELLED_IMAGE}]')
+    train_parser.add_argument('--resize-width', type=int, default=500,
+                              help='Width frames are resized to [default: 500]')
+    args = parser.parse_args()
+
+    try:
+        summary = train(args.labels, args.board_size, args.output,
+                        image=args.image, resize_width=args.resize_width)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    counts = summary['cell_counts']
+    print(f"Trained on {summary['frames']} frames ({summary['cells']} cells: "
+          f"{counts['black']} black, {counts['white']} white, {counts['empty']} empty)")
+    print(f"Training accuracy: {summary['train_accuracy']:.1%} "
+          f"(colour-coverage rule: {summary['rule_accuracy']:.1%})")
+    print(f"Classifier saved to: {summary['output']}")
+
+
+if __name__ == '__main__':
+    main()
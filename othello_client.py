@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Othello CV Client
+=================
+Thin client for a warm `othello_demo.py --serve` process.
+
+Submits an othello_demo.py command line over a Unix socket and prints the
+same output, without importing OpenCV or NumPy. Uses only the standard
+library so start-up stays fast.
+
+Usage:
+    python othello_demo.py --serve /tmp/othello-cv.sock &
+    python othello_client.py --socket /tmp/othello-cv.sock --image board.png --board-size 4
+
+Protocol (one JSON object per line):
+    request:   {"argv": [...], "cwd": "..."}
+    responses: {"stream": "stdout" | "stderr", "data": "..."} ...
+               {"exit": <exit code>}
+"""
+
+import os
+import sys
+import json
+import socket
+from typing import Dict, List, Optional
+
+
+DEFAULT_SOCKET_ENV = 'OTHELLO_CV_SOCKET'
+
+
+def send_message(sock: socket.socket, message: Dict) -> None:
+    """Send one newline-delimited JSON message."""
+    sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+def read_messages(sock_file):
+    """Yield newline-delimited JSON messages until the connection closes."""
+    for line in sock_file:
+        yield json.loads(line)
+
+
+def submit(socket_path: str, argv: List[str], cwd: Optional[str] = None) -> int:
+    """
+    Run an othello_demo.py command on a warm server.
+
+    Args:
+        socket_path: Unix socket the server listens on
+        argv: othello_demo.py arguments
+        cwd: Working directory for relative paths (default: current)
+
+    Returns:
+        Exit code of the command
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_message(sock, {"argv": argv, "cwd": cwd or os.getcwd()})
+
+        with sock.makefile('r', encoding='utf-8') as sock_file:
+            for message in read_messages(sock_file):
+                if 'exit' in message:
+                    return message['exit']
+                stream = sys.stderr if message['stream'] == 'stderr' else sys.stdout
+                stream.write(message['data'])
+
+    print("Error: server closed the connection without an exit status", file=sys.stderr)
+    return 1
+
+
+def main():
+    argv = sys.argv[1:]
+    socket_path = os.environ.get(DEFAULT_SOCKET_ENV)
+
+    # Take --socket out; everything else is forwarded to othello_demo.py
+    if '--socket' in argv:
+        position = argv.index('--socket')
+        if position + 1 >= len(argv):
+            print("Error: --socket requires a path", file=sys.stderr)
+            sys.exit(2)
+        socket_path = argv[position + 1]
+        del argv[position:position + 2]
+
+    if not socket_path:
+        print(f"Error: pass --socket PATH or set {DEFAULT_SOCKET_ENV}", file=sys.stderr)
+        sys.exit(2)
+
+    try:
+        exit_code = submit(socket_path, argv)
+    except OSError as e:
+        print(f"Error: could not reach server at {socket_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.stdout.flush()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,56 @@ Supports both 4x4 (GamesmanUni) and 8x8 (standard) Othello boards.
 
 import cv2
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple, Dict, Optional
 import json
 
+from othello_frame_cache import FrameCache
+
+
+# Constructor parameters that can be tuned and stored in a config file
+TUNABLE_PARAMETERS = (
+    'skip_frames', 'motion_threshold', 'color_threshold', 'resize_width',
+    'adaptive_sampling', 'max_skip_frames', 'settle_frames', 'frame_memo_size'
+)
+
+
+def load_config(config_path: str) -> Dict:
+    """
+    Load tuned OthelloCV parameters from a JSON config file.
+
+    Args:
+        config_path: Path to a config written by save_config
+
+    Returns:
+        Dictionary of constructor keyword arguments
+    """
+    with open(config_path) as f:
+        config = json.load(f)
+
+    params = config.get('parameters', config)
+    unknown = set(params) - set(TUNABLE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters in config {config_path}: {', '.join(sorted(unknown))}")
+    return params
+
+
+def save_config(params: Dict, config_path: str, metadata: Optional[Dict] = None) -> None:
+    """
+    Save OthelloCV parameters to a JSON config file.
+
+    Args:
+        params: Constructor keyword arguments (see TUNABLE_PARAMETERS)
+        config_path: Output path
+        metadata: Optional extra information stored alongside the parameters
+    """
+    config = {"parameters": {name: params[name] for name in TUNABLE_PARAMETERS if name in params}}
+    if metadata:
+        config["metadata"] = metadata
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+
 
 class OthelloCV:
     """
@@ -22,6 +69,15 @@ class OthelloCV:
         skip_frames (int): Number of frames to skip in video processing
         motion_threshold (int): Threshold for motion detection
         color_threshold (float): Threshold for piece color detection (0-1)
+        adaptive_sampling (bool): Use event-driven sampling in process_video
+        max_skip_frames (int): Largest sampling stride while the board is static
+        dense_skip_frames (int): Sampling stride while motion is in progress
+        settle_frames (int): Frames without motion before classifying
+        frame_memo_size (int): Board fingerprints remembered by process_frame
+        reuse_buffers (bool): Reuse preallocated intermediates in process_video
+        classifier (CellClassifier): Learned cell classifier, or None for the
+            colour-coverage rule
+        classifier_batch_size (int): Frames per classifier predict call in process_video
     """
 
     def __init__(
@@ -30,7 +86,15 @@ class OthelloCV:
         resize_width: int = 500,
         skip_frames: int = 20,
         motion_threshold: int = 10,
-        color_threshold: float = 0.3
+        color_threshold: float = 0.3,
+        adaptive_sampling: bool = False,
+        max_skip_frames: Optional[int] = None,
+        dense_skip_frames: int = 2,
+        settle_frames: Optional[int] = None,
+        frame_memo_size: int = 128,
+        reuse_buffers: bool = True,
+        classifier=None,
+        classifier_batch_size: int = 32
     ):
         """
         Initialize Othello CV processor.
@@ -41,6 +105,23 @@ class OthelloCV:
             skip_frames: Frames to skip in video processing
             motion_threshold: Threshold for motion detection
             color_threshold: Threshold for piece detection (0-1)
+            adaptive_sampling: Back off while the board is static, sample
+                densely during motion and classify once motion settles
+            max_skip_frames: Largest stride for adaptive sampling
+                (default: 8 x skip_frames)
+            dense_skip_frames: Stride for adaptive sampling during motion
+            settle_frames: Frames without motion before adaptive sampling
+                classifies a frame (default: skip_frames // 2)
+            frame_memo_size: Size of the LRU of board fingerprints used to
+                skip re-classifying identical-looking frames (0 disables)
+            reuse_buffers: Decode and filter into buffers preallocated per
+                resolution so the process_video loop does not allocate per
+                frame (an instance then must not run two videos at once)
+            classifier: Path to a cell classifier trained with
+                `othello_classifier.py train` (or a CellClassifier) used
+                instead of the colour-coverage rule
+            classifier_batch_size: Classified frames process_video queues
+                for each classifier predict call
         """
         if board_size not in [4, 8]:
             raise ValueError("Board size must be 4 or 8")
@@ -52,6 +133,29 @@ class OthelloCV:
         self.skip_frames = skip_frames
         self.motion_threshold = motion_threshold
         self.color_threshold = color_threshold
+        self.adaptive_sampling = adaptive_sampling
+        self.max_skip_frames = max_skip_frames or skip_frames * 8
+        self.dense_skip_frames = dense_skip_frames
+        self.settle_frames = settle_frames if settle_frames is not None else skip_frames // 2
+        self.frame_memo_size = frame_memo_size
+
+        # LRU of board fingerprint -> grid, with hit statistics
+        self._frame_memo = OrderedDict()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+        # Intermediate images reused across frames by process_video
+        self.reuse_buffers = reuse_buffers
+        self._buffers = _FrameBuffers(enabled=reuse_buffers)
+
+        # Optional learned cell classifier (needs scikit-learn)
+        if isinstance(classifier, str):
+            from othello_classifier import CellClassifier
+            classifier = CellClassifier.load(classifier)
+        if classifier is not None and classifier.board_size != board_size:
+            raise ValueError(f"Classifier was trained for {classifier.board_size}x{classifier.board_size} boards")
+        self.classifier = classifier
+        self.classifier_batch_size = max(classifier_batch_size, 1)
 
         # HSV color ranges for piece detection (RGB values)
         self.BLACK_LOWER = np.array([0, 0, 0])
@@ -96,7 +200,10 @@ class OthelloCV:
         self,
         video_path: str,
         save_debug: bool = False,
-        output_video_path: Optional[str] = None
+        output_video_path: Optional[str] = None,
+        frame_cache: Optional[FrameCache] = None,
+        on_move: Optional[Callable[[Dict], None]] = None,
+        chunks: int = 1
     ) -> Dict:
         """
         Process a video and extract all game states.
@@ -105,85 +212,326 @@ class OthelloCV:
             video_path: Path to the video file
             save_debug: Whether to save debug images
             output_video_path: Optional path to save annotated video
+            frame_cache: Optional FrameCache to read decoded frames from
+                instead of decoding the video (see FrameCache.open)
+            on_move: Optional callback invoked with each move as it is
+                detected (e.g. PositionIndex.recorder)
+            chunks: Split the video into this many time ranges processed
+                by parallel worker processes (fixed sampling only: adaptive
+                sampling depends on every earlier frame, so chunks would
+                sample different frames than a sequential run)
 
         Returns:
             Dictionary with game moves and metadata
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Could not open video: {video_path}")
+        if chunks > 1:
+            if self.adaptive_sampling:
+                raise ValueError("Chunked processing cannot be combined with adaptive sampling")
+            if output_video_path or frame_cache is not None:
+                raise ValueError("Chunked processing cannot write annotated video "
+                                 "or read from a frame cache")
+            return self._process_video_chunked(video_path, chunks, on_move)
 
-        # Setup video writer if output requested
         video_writer = None
-        if output_video_path:
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            video_writer = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+        if frame_cache is not None:
+            if output_video_path:
+                raise ValueError("Annotated video output needs full-resolution frames; "
+                                 "it cannot be combined with a frame cache")
+            if self.skip_frames % frame_cache.stride != 0:
+                raise ValueError(f"skip_frames ({self.skip_frames}) must be a multiple "
+                                 f"of the frame cache stride ({frame_cache.stride})")
+            source = frame_cache
+        else:
+            cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {video_path}")
+
+            # Setup video writer if output requested
+            if output_video_path:
+                fps = int(cap.get(cv2.CAP_PROP_FPS))
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                video_writer = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+            source = _CaptureReader(cap, buffers=self._buffers)
+
+        moves = []
+
+        def add_move(frame_count: int, state: str) -> None:
+            moves.append({
+                "player": len(moves) % 2 + 1,  # Alternate between 1 and 2
+                "state": state,
+                "frame": frame_count
+            })
+            if on_move:
+                on_move(moves[-1])
+
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+        try:
+            classified_frames = self._scan_frames(source, add_move, video_writer=video_writer)
+        finally:
+            # Cleanup
+            if frame_cache is None:
+                cap.release()
+            if video_writer:
+                video_writer.release()
+
+        return {
+            "board_size": self.board_size,
+            "moves": moves,
+            "total_moves": len(moves),
+            "total_frames": source.total_frames,
+            "classified_frames": classified_frames,
+            "sampling": "adaptive" if self.adaptive_sampling else "fixed",
+            "frame_memo": self.memo_stats(),
+            "video_path": video_path,
+            "output_video": output_video_path,
+            "frame_cache": frame_cache.cache_dir if frame_cache is not None else None
+        }
+
+    def _scan_frames(
+        self,
+        source,
+        on_state: Callable[[int, str], None],
+        first_sample: int = 0,
+        report_from: int = 0,
+        video_writer=None
+    ) -> int:
+        """
+        Run motion detection and classification over a frame source.
+
+        Args:
+            source: Frame reader (_CaptureReader or FrameCache)
+            on_state: Called with (frame number, position string) whenever
+                the detected position changes
+            first_sample: Frame number of the first sampled frame
+            report_from: Frames before this only warm up motion tracking;
+                their positions are neither reported nor remembered
+            video_writer: Optional writer for annotated frames
+
+        With a learned classifier (and no annotated output), classified
+        frames are queued and labelled classifier_batch_size at a time in
+        one predict call; positions are still reported in frame order.
+
+        Returns:
+            Number of frames classified
+        """
+        buffers = self._buffers
+        batch = [] if self.classifier is not None and video_writer is None else None
 
         # Read first frame for motion detection
-        ret, previous_frame = cap.read()
-        if not ret:
-            raise ValueError("Could not read first frame from video")
+        previous_frame = source.first_frame()
+        if previous_frame is None:
+            raise _NoFramesError("Could not read first frame from video")
 
-        previous_frame_gray = cv2.cvtColor(previous_frame, cv2.COLOR_BGR2GRAY)
-        previous_frame_gray = cv2.GaussianBlur(previous_frame_gray, (21, 21), 0)
+        # Blurred grays alternate between two buffers: one holds the
+        # motion reference while the other receives the current frame
+        blur_slot = 0
+        previous_frame_gray = self._blurred_gray(previous_frame, 'blur_1')
 
         # Initialize tracking variables
         previous_position_string = '-' * (self.board_size * self.board_size)
-        moves = []
-        frame_count = 0
-        player = 1
 
-        # Process video frames
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+        def report(frame_count: int, grid: np.ndarray) -> None:
+            nonlocal previous_position_string
+            current_position_string = self.grid_to_position_string(grid)
+
+            # Check if state changed
+            if current_position_string != previous_position_string and frame_count >= report_from:
+                on_state(frame_count, current_position_string)
+                previous_position_string = current_position_string
+
+        def flush_batch() -> None:
+            self._predict_batch(batch)
+            for frame_count, grid, _, _ in batch:
+                report(frame_count, grid)
+            batch.clear()
+        next_sample = first_sample
+        stride = self.skip_frames
+        awaiting_stable = True
+        stable_since = first_sample - 1
+        classified_frames = 0
+
+        # Process video frames at intervals of skip_frames, or at adaptive
+        # intervals driven by motion
+        while True:
+            sample = source.next_frame(next_sample)
+            if sample is None:
                 break
+            frame_count, frame = sample
 
             # Convert frame for motion detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (21, 21), 0)
-
-            # Process frame at intervals when no motion detected
-            if frame_count % self.skip_frames == 0:
-                if not self._is_motion(previous_frame_gray, gray):
-                    # Process the stable frame
-                    grid = self.process_frame(frame, save_debug=False)
-                    current_position_string = self.grid_to_position_string(grid)
-
-                    # Check if state changed
-                    if current_position_string != previous_position_string:
-                        moves.append({
-                            "player": player,
-                            "state": current_position_string,
-                            "frame": frame_count
-                        })
-                        player = (player % 2) + 1  # Toggle between 1 and 2
-                        previous_position_string = current_position_string
-
-                    # Annotate frame if saving video
-                    if video_writer:
-                        annotated_frame = self._annotate_frame(frame.copy(), grid)
-                        video_writer.write(annotated_frame)
-
+            gray = self._blurred_gray(frame, f'blur_{blur_slot}')
+            motion = self._is_motion(previous_frame_gray, gray, buffers=buffers)
+
+            if self.adaptive_sampling:
+                # Motion is measured against the last frame that changed, so
+                # slow animations still register. The board cannot change
+                # without motion: classify once a change has settled for
+                # settle_frames, then back off until the next change.
+                if motion:
+                    stable_since = frame_count
+                    awaiting_stable = True
+                classify = awaiting_stable and frame_count - stable_since >= self.settle_frames
+                if awaiting_stable and not classify:
+                    stride = self.dense_skip_frames
+                elif classify:
+                    stride = self.skip_frames
+                    awaiting_stable = False
+                else:
+                    # Back off exponentially while the board is static
+                    stride = min(stride * 2, self.max_skip_frames)
+            else:
+                classify = not motion
+
+            next_sample = frame_count + stride
+
+            # Process frame when no motion detected
+            if classify:
+                # Process the stable frame
+                classified_frames += 1
+                if batch is not None:
+                    self._queue_for_batch(batch, frame_count, frame, buffers)
+                    if len(batch) >= self.classifier_batch_size:
+                        flush_batch()
+                else:
+                    grid = self._classify_frame(frame, buffers=buffers)
+                    report(frame_count, grid)
+
+                # Annotate frame if saving video
+                if video_writer:
+                    annotated_frame = buffers.get('annotated', frame.shape)
+                    if annotated_frame is None:
+                        annotated_frame = frame.copy()
+                    else:
+                        np.copyto(annotated_frame, frame)
+                    video_writer.write(self._annotate_frame(annotated_frame, grid))
+
+            if motion or not self.adaptive_sampling:
                 previous_frame_gray = gray
+                blur_slot ^= 1
+
+        if batch:
+            flush_batch()
 
-            frame_count += 1
+        return classified_frames
 
-        # Cleanup
+    def _process_video_chunked(
+        self,
+        video_path: str,
+        chunks: int,
+        on_move: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Process time ranges of a video in parallel and stitch the results.
+
+        Chunk boundaries are aligned to skip_frames so fixed sampling visits
+        the same frames as a sequential run. Each worker also scans an
+        overlap before its range to warm up motion and position tracking.
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        # Frame numbers start after the motion reference frame
+        frame_estimate = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) - 1, 1)
         cap.release()
-        if video_writer:
-            video_writer.release()
+
+        chunk_length = -(-frame_estimate // chunks)
+        chunk_length = -(-chunk_length // self.skip_frames) * self.skip_frames
+        overlap = self.skip_frames
+
+        starts = list(range(0, frame_estimate, chunk_length))
+        ranges = [
+            (video_path, start, starts[i + 1] if i + 1 < len(starts) else None, overlap)
+            for i, start in enumerate(starts)
+        ]
+
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            chunk_results = list(executor.map(self._process_chunk, ranges))
+
+        states = stitch_chunk_states(
+            [chunk['states'] for chunk in chunk_results],
+            '-' * (self.board_size * self.board_size)
+        )
+
+        moves = []
+        for frame_count, state in states:
+            moves.append({
+                "player": len(moves) % 2 + 1,  # Alternate between 1 and 2
+                "state": state,
+                "frame": frame_count
+            })
+            if on_move:
+                on_move(moves[-1])
+
+        self.memo_hits = sum(chunk['memo_hits'] for chunk in chunk_results)
+        self.memo_misses = sum(chunk['memo_misses'] for chunk in chunk_results)
 
         return {
             "board_size": self.board_size,
             "moves": moves,
             "total_moves": len(moves),
-            "total_frames": frame_count,
+            "total_frames": max(chunk['total_frames'] for chunk in chunk_results),
+            "classified_frames": sum(chunk['classified_frames'] for chunk in chunk_results),
+            "sampling": "adaptive" if self.adaptive_sampling else "fixed",
+            "frame_memo": self.memo_stats(),
+            "chunks": len(ranges),
             "video_path": video_path,
-            "output_video": output_video_path
+            "output_video": None,
+            "frame_cache": None
+        }
+
+    def _process_chunk(self, job: Tuple[str, int, Optional[int], int]) -> Dict:
+        """
+        Scan one time range of a video (run in a worker process).
+
+        Args:
+            job: (video path, first frame, end frame or None, overlap)
+
+        Returns:
+            Dictionary with the position changes at or after the first
+            frame, and scan statistics
+        """
+        video_path, start, end, overlap = job
+        scan_start = max(start - overlap, 0)
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        source = _CaptureReader(cap, start=scan_start, end=end, buffers=self._buffers)
+
+        states = []
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+        try:
+            # The overlap only warms up motion tracking; its positions
+            # belong to the previous chunk
+            classified_frames = self._scan_frames(
+                source,
+                lambda frame_count, state: states.append((frame_count, state)),
+                first_sample=scan_start,
+                report_from=start
+            )
+        except _NoFramesError:
+            # Range starts past the real end of the video (frame counts
+            # reported by containers can overshoot); any other error is real
+            if scan_start == 0:
+                raise
+            classified_frames = 0
+        finally:
+            cap.release()
+
+        return {
+            "states": states,
+            "classified_frames": classified_frames,
+            "total_frames": source.total_frames,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses
         }
 
     def process_frame(self, frame: np.ndarray, save_debug: bool = False) -> np.ndarray:
@@ -198,15 +546,36 @@ class OthelloCV:
             2D numpy array representing the board
             (1 = black, -1 = white, 0 = empty)
         """
-        # Resize frame
-        img_h, img_w = frame.shape[:2]
-        scale = self.resize_width / img_w
-        img_w = int(img_w * scale)
-        img_h = int(img_h * scale)
-        img = cv2.resize(frame, (img_w, img_h), interpolation=cv2.INTER_AREA)
+        return self._classify_frame(frame, save_debug=save_debug)
+
+    def _classify_frame(
+        self,
+        frame: np.ndarray,
+        save_debug: bool = False,
+        buffers: Optional['_FrameBuffers'] = None
+    ) -> np.ndarray:
+        """
+        Classify a frame, optionally writing every intermediate into buffers.
+
+        With enabled buffers the returned grid is itself a buffer and is
+        overwritten by the next call.
+        """
+        buffers = buffers or _NO_BUFFERS
+        img = self._resize_frame(frame, buffers)
+        img_h, img_w = img.shape[:2]
+
+        grid = buffers.get('grid', (self.board_height, self.board_width), dtype=int)
+        if grid is None:
+            grid = np.zeros((self.board_height, self.board_width), dtype=int)
+
+        # Reuse the grid of a previously seen, identical-looking board
+        fingerprint, cached_grid = (None, None) if save_debug else self._memo_lookup(img, buffers)
+        if cached_grid is not None:
+            np.copyto(grid, cached_grid)
+            return grid
 
         # Apply bilateral filter to reduce noise
-        bilateral_filtered = cv2.bilateralFilter(img, 15, 190, 190)
+        bilateral_filtered = cv2.bilateralFilter(img, 15, 190, 190, dst=buffers.get('bilateral', img.shape))
 
         if save_debug:
             cv2.imwrite('masks/bilateral_filtered_image.png', bilateral_filtered)
@@ -226,12 +595,16 @@ class OthelloCV:
                         (img_w, i * cell_height), (0, 255, 0), 1)
             cv2.imwrite('masks/grid_image_with_cells.png', grid_image)
 
-        # Initialize grid
-        grid = np.zeros((self.board_height, self.board_width), dtype=int)
+        if self.classifier is not None:
+            np.copyto(grid, self.classifier.predict([bilateral_filtered])[0])
+            self._remember_grid(fingerprint, grid)
+            return grid
 
-        # Create color masks
-        white_mask = cv2.inRange(bilateral_filtered, self.WHITE_LOWER, self.WHITE_UPPER)
-        black_mask = cv2.inRange(bilateral_filtered, self.BLACK_LOWER, self.BLACK_UPPER)
+        # Create color masks once; each cell reads its own region of them
+        white_mask = cv2.inRange(bilateral_filtered, self.WHITE_LOWER, self.WHITE_UPPER,
+                                 dst=buffers.get('white_mask', (img_h, img_w)))
+        black_mask = cv2.inRange(bilateral_filtered, self.BLACK_LOWER, self.BLACK_UPPER,
+                                 dst=buffers.get('black_mask', (img_h, img_w)))
 
         if save_debug:
             cv2.imwrite('masks/white_mask.png', white_mask)
@@ -247,16 +620,211 @@ class OthelloCV:
 
                 grid[row, col] = self._process_cell(
                     bilateral_filtered,
+                    white_mask, black_mask,
                     x_start, y_start,
                     cell_width, cell_height,
                     save_debug=(save_debug and row == 0 and col == 0)
                 )
 
+        self._remember_grid(fingerprint, grid)
         return grid
 
+    def classify_frames(self, frames: List[np.ndarray]) -> np.ndarray:
+        """
+        Classify a batch of frames.
+
+        With a learned classifier, the cell features of all frames are
+        extracted as one array and labelled in a single predict call.
+
+        Args:
+            frames: BGR frames
+
+        Returns:
+            Board grids (frames, rows, cols)
+        """
+        if self.classifier is None:
+            return np.stack([self.process_frame(frame) for frame in frames])
+        return self.classifier.predict([self.filter_frame(frame) for frame in frames])
+
+    def filter_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Resize and denoise a frame as process_frame does before classifying.
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            Filtered BGR image resize_width pixels wide
+        """
+        img = self._resize_frame(frame, _NO_BUFFERS)
+        return cv2.bilateralFilter(img, 15, 190, 190)
+
+    def _resize_frame(self, frame: np.ndarray, buffers: '_FrameBuffers') -> np.ndarray:
+        """Resize a frame to resize_width (cached frames may already be at the target width)."""
+        img_h, img_w = frame.shape[:2]
+        if img_w == self.resize_width:
+            return frame
+        scale = self.resize_width / img_w
+        img_w = int(img_w * scale)
+        img_h = int(img_h * scale)
+        return cv2.resize(frame, (img_w, img_h), dst=buffers.get('resized', (img_h, img_w, 3)),
+                          interpolation=cv2.INTER_AREA)
+
+    def _memo_lookup(
+        self,
+        img: np.ndarray,
+        buffers: '_FrameBuffers'
+    ) -> Tuple[Optional[bytes], Optional[np.ndarray]]:
+        """
+        Look up a resized frame in the fingerprint memo.
+
+        Returns:
+            Tuple of (fingerprint, or None when the memo is disabled;
+            remembered grid, or None on a miss)
+        """
+        if self.frame_memo_size <= 0:
+            return None, None
+        fingerprint = self._frame_fingerprint(img, buffers)
+        cached_grid = self._frame_memo.get(fingerprint)
+        if cached_grid is None:
+            self.memo_misses += 1
+        else:
+            self._frame_memo.move_to_end(fingerprint)
+            self.memo_hits += 1
+        return fingerprint, cached_grid
+
+    def _queue_for_batch(
+        self,
+        batch: List[List],
+        frame_count: int,
+        frame: np.ndarray,
+        buffers: '_FrameBuffers'
+    ) -> None:
+        """
+        Queue a frame for batched classifier prediction.
+
+        Entries are [frame_count, grid or None until predicted, filtered
+        image or None, fingerprint]. A frame matching the memo, or a queued
+        frame with the same fingerprint, is not filtered or predicted again.
+        """
+        img = self._resize_frame(frame, buffers)
+        fingerprint, cached_grid = self._memo_lookup(img, buffers)
+        if cached_grid is not None:
+            batch.append([frame_count, cached_grid, None, fingerprint])
+        elif fingerprint is not None and any(entry[3] == fingerprint for entry in batch):
+            batch.append([frame_count, None, None, fingerprint])
+        else:
+            # A fresh image: queued frames must outlive the reused buffers
+            batch.append([frame_count, None, cv2.bilateralFilter(img, 15, 190, 190), fingerprint])
+
+    def _predict_batch(self, batch: List[List]) -> None:
+        """Fill in the grids of queued frames with one classifier predict call."""
+        pending = [entry for entry in batch if entry[2] is not None]
+        if pending:
+            grids = self.classifier.predict([entry[2] for entry in pending])
+            for entry, grid in zip(pending, grids):
+                entry[1] = grid
+                entry[2] = None
+                self._remember_grid(entry[3], grid)
+
+        # Frames that shared a fingerprint with a predicted one
+        predicted = {entry[3]: entry[1] for entry in pending}
+        for entry in batch:
+            if entry[1] is None:
+                entry[1] = predicted[entry[3]]
+
+    def _remember_grid(self, fingerprint: Optional[bytes], grid: np.ndarray) -> None:
+        """Store a classified grid in the fingerprint memo."""
+        if fingerprint is not None:
+            self._frame_memo[fingerprint] = grid.copy()
+            if len(self._frame_memo) > self.frame_memo_size:
+                self._frame_memo.popitem(last=False)
+
+    def _frame_fingerprint(self, img: np.ndarray, buffers: Optional['_FrameBuffers'] = None) -> bytes:
+        """
+        Compute a cheap fingerprint of the board region.
+
+        The resized board is reduced to 4x4 tiles per cell and quantized to
+        16 levels per channel, so noise and small UI changes map to the same
+        fingerprint while a changed piece alters its cell's tiles.
+
+        Args:
+            img: Resized BGR board image
+            buffers: Optional buffers for the tile images
+
+        Returns:
+            Fingerprint bytes
+        """
+        buffers = buffers or _NO_BUFFERS
+        tiles_shape = (self.board_height * 4, self.board_width * 4, 3)
+        tiles = cv2.resize(img, tiles_shape[1::-1], dst=buffers.get('tiles', tiles_shape),
+                           interpolation=cv2.INTER_AREA)
+        return np.right_shift(tiles, 4, out=buffers.get('tiles_quantized', tiles_shape)).tobytes()
+
+    def profile_allocations(self, video_path: str, sampled_frames: int = 25) -> Dict:
+        """
+        Measure steady-state Python allocations of the process_video loop.
+
+        Traced memory is snapshotted after `sampled_frames` and again after
+        twice that many sampled frames, so buffers allocated while warming
+        up are excluded. The snapshot difference is memory retained per
+        frame; the traced peak between the snapshots is the largest
+        transient allocation.
+
+        Args:
+            video_path: Path to the video file
+            sampled_frames: Sampled frames per measurement window
+
+        Returns:
+            Dictionary with retained bytes per frame, transient peak bytes
+            and the top allocation sites of the difference
+        """
+        import tracemalloc
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+
+        source = _ProfilingReader(_CaptureReader(cap, buffers=self._buffers), sampled_frames)
+        tracemalloc.start()
+        try:
+            self._scan_frames(source, lambda frame_count, state: None)
+        finally:
+            tracemalloc.stop()
+            cap.release()
+
+        if source.second is None:
+            raise ValueError(f"Video too short to profile {2 * sampled_frames} sampled frames")
+
+        differences = source.second.compare_to(source.first, 'lineno')
+        retained = sum(difference.size_diff for difference in differences)
+        return {
+            "sampled_frames": sampled_frames,
+            "retained_bytes_per_frame": retained / sampled_frames,
+            "transient_peak_bytes": source.peak,
+            "top_sites": [str(difference) for difference in differences[:3] if difference.size_diff]
+        }
+
+    def memo_stats(self) -> Dict:
+        """
+        Report fingerprint memoization statistics since the last video.
+
+        Returns:
+            Dictionary with hits, misses and hit rate
+        """
+        lookups = self.memo_hits + self.memo_misses
+        return {
+            "hits": self.memo_hits,
+            "misses": self.memo_misses,
+            "hit_rate": round(self.memo_hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._frame_memo)
+        }
+
     def _process_cell(
         self,
         img: np.ndarray,
+        white_mask: np.ndarray,
+        black_mask: np.ndarray,
         x_start: int,
         y_start: int,
         width: int,
@@ -266,6 +834,8 @@ class OthelloCV:
         """
         Process a single cell and determine piece color.
 
+        The colour masks cover the whole image; the cell uses views of them.
+
         Returns:
             1 for black, -1 for white, 0 for empty
         """
@@ -275,9 +845,9 @@ class OthelloCV:
         if save_debug:
             cv2.imwrite('masks/cell_img.png', cell_img)
 
-        # Create masks for this cell
-        white_mask_cell = cv2.inRange(cell_img, self.WHITE_LOWER, self.WHITE_UPPER)
-        black_mask_cell = cv2.inRange(cell_img, self.BLACK_LOWER, self.BLACK_UPPER)
+        # Masks for this cell
+        white_mask_cell = white_mask[y_start:y_start + height, x_start:x_start + width]
+        black_mask_cell = black_mask[y_start:y_start + height, x_start:x_start + width]
 
         if save_debug:
             cv2.imwrite('masks/white_mask_cell.png', white_mask_cell)
@@ -305,22 +875,38 @@ class OthelloCV:
         white_area_ratio = white_pixels / mask.size
         return white_area_ratio > self.color_threshold
 
-    def _is_motion(self, previous_frame: np.ndarray, current_frame: np.ndarray) -> bool:
+    def _is_motion(
+        self,
+        previous_frame: np.ndarray,
+        current_frame: np.ndarray,
+        buffers: Optional['_FrameBuffers'] = None
+    ) -> bool:
         """
         Detect motion between two frames.
 
         Args:
             previous_frame: Previous frame (grayscale)
             current_frame: Current frame (grayscale)
+            buffers: Optional buffers for the difference images
 
         Returns:
             True if motion detected
         """
-        frame_delta = cv2.absdiff(previous_frame, current_frame)
-        thresholded = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
-        motion_level = np.sum(thresholded)
+        buffers = buffers or _NO_BUFFERS
+        frame_delta = cv2.absdiff(previous_frame, current_frame,
+                                  dst=buffers.get('delta', current_frame.shape))
+        thresholded = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY,
+                                    dst=buffers.get('thresholded', current_frame.shape))[1]
+        # Same as summing the 0/255 image, without a temporary
+        motion_level = cv2.countNonZero(thresholded) * 255
         return motion_level > self.motion_threshold
 
+    def _blurred_gray(self, frame: np.ndarray, buffer_name: str) -> np.ndarray:
+        """Grayscale and blur a frame for motion detection, into a reusable buffer."""
+        shape = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._buffers.get('gray', shape))
+        return cv2.GaussianBlur(gray, (21, 21), 0, dst=self._buffers.get(buffer_name, shape))
+
     def _annotate_frame(self, frame: np.ndarray, grid: np.ndarray) -> np.ndarray:
         """
         Annotate frame with detected pieces and grid.
@@ -412,3 +998,167 @@ class OthelloCV:
         """
         indent = 2 if pretty else None
         return json.dumps(result, indent=indent)
+
+
+class _NoFramesError(ValueError):
+    """Raised when a frame source has no frame to start scanning from."""
+
+
+class _CaptureReader:
+    """
+    Sequential frame reader over an open cv2.VideoCapture.
+
+    Frames before the requested one are grabbed without being retrieved,
+    which skips the colour conversion for frames that are never analysed.
+    A reader can cover a time range: its motion reference is the frame just
+    before `start`, and it stops before `end`.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        start: int = 0,
+        end: Optional[int] = None,
+        buffers: Optional['_FrameBuffers'] = None
+    ):
+        self.cap = cap
+        self.end = end
+        self.total_frames = start
+        if start > 0:
+            # Frame numbers start after the reference frame (decoded frame 0)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+        # Decode into one reused frame buffer when enabled
+        shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        self.frame = (buffers or _NO_BUFFERS).get('frame', shape)
+
+    def _read(self) -> Optional[np.ndarray]:
+        ret, frame = self.cap.read(self.frame)
+        if not ret:
+            return None
+        if self.frame is not None:
+            self.frame = frame
+        return frame
+
+    def first_frame(self) -> Optional[np.ndarray]:
+        """Read the motion reference frame."""
+        return self._read()
+
+    def next_frame(self, target: int) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Read the frame with the given number.
+
+        Args:
+            target: Frame number to read (must not be behind the reader)
+
+        Returns:
+            (frame number, frame), or None at the end of the video or range
+        """
+        if self.end is not None and target >= self.end:
+            return None
+
+        while self.total_frames < target:
+            if not self.cap.grab():
+                return None
+            self.total_frames += 1
+
+        frame = self._read()
+        if frame is None:
+            return None
+        self.total_frames += 1
+        return target, frame
+
+
+class _ProfilingReader:
+    """
+    Frame source wrapper for OthelloCV.profile_allocations.
+
+    Snapshots traced memory after `window` and 2 x `window` sampled frames,
+    then ends the scan.
+    """
+
+    def __init__(self, source, window: int):
+        import tracemalloc
+        self.tracemalloc = tracemalloc
+        self.source = source
+        self.window = window
+        self.sampled = 0
+        self.first = None
+        self.second = None
+        self.peak = 0
+        self._baseline = 0
+        # Leave the profiler's own allocations out of the snapshots
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    def first_frame(self) -> Optional[np.ndarray]:
+        return self.source.first_frame()
+
+    def next_frame(self, target: int) -> Optional[Tuple[int, np.ndarray]]:
+        if self.sampled == self.window:
+            self.first = self.tracemalloc.take_snapshot().filter_traces(self._filters)
+            self._baseline = self.tracemalloc.get_traced_memory()[0]
+            self.tracemalloc.reset_peak()
+        elif self.sampled == 2 * self.window:
+            self.peak = self.tracemalloc.get_traced_memory()[1] - self._baseline
+            self.second = self.tracemalloc.take_snapshot().filter_traces(self._filters)
+            return None
+        self.sampled += 1
+        return self.source.next_frame(target)
+
+
+class _FrameBuffers:
+    """
+    Preallocated intermediate images for the process_video loop.
+
+    Buffers are keyed by name and reallocated only when the requested shape
+    changes (e.g. a new video resolution). When disabled, get() returns
+    None so OpenCV allocates a fresh output as usual.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._buffers = {}
+
+    def __getstate__(self) -> Dict:
+        # Worker processes allocate their own buffers
+        return {"enabled": self.enabled, "_buffers": {}}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> Optional[np.ndarray]:
+        """Return the named buffer with the given shape, or None when disabled."""
+        if not self.enabled:
+            return None
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+
+
+_NO_BUFFERS = _FrameBuffers(enabled=False)
+
+
+def stitch_chunk_states(
+    chunk_states: List[List[Tuple[int, str]]],
+    initial_state: str
+) -> List[Tuple[int, str]]:
+    """
+    Join per-chunk position changes into one sequence.
+
+    A chunk reports the first position it sees even when it matches the
+    position at the end of the previous chunk; those repeats are dropped.
+
+    Args:
+        chunk_states: (frame number, position string) lists in time order
+        initial_state: Position before the first move (empty board)
+
+    Returns:
+        Position changes across the whole video
+    """
+    stitched = []
+    previous_state = initial_state
+    for states in chunk_states:
+        for frame_count, state in states:
+            if state != previous_state:
+                stitched.append((frame_count, state))
+                previous_state = state
+    return stitched
@@ -10,14 +10,47 @@ Usage:
 """
 
 import argparse
+import json
 import sys
 import os
 import time
 from pathlib import Path
-from othello_cv import OthelloCV
+from othello_cv import OthelloCV, TUNABLE_PARAMETERS, load_config, save_config
+from othello_frame_cache import FrameCache
+from othello_records import RecordWriter
+from othello_position_index import PositionIndex
+from othello_client import send_message, read_messages
 
 
-def main():
+# OthelloCV instances reused across jobs in --serve mode
+_processors = {}
+
+
+def get_processor(board_size: int, params: dict) -> OthelloCV:
+    """Return a cached OthelloCV for a board size and parameter set."""
+    key = (board_size, tuple(sorted(params.items())))
+    if key not in _processors:
+        _processors[key] = OthelloCV(board_size=board_size, **params)
+    return _processors[key]
+
+
+def _attach_position_values(argv: list) -> list:
+    """
+    Join --query-position with its value.
+
+    Position strings usually start with '-', which argparse would read as
+    an option, so `--query-position -----WB--...` becomes
+    `--query-position=-----WB--...`.
+    """
+    argv = list(argv)
+    for i, arg in enumerate(argv[:-1]):
+        if arg == '--query-position':
+            argv[i:i + 2] = [f'{arg}={argv[i + 1]}']
+            break
+    return argv
+
+
+def main(argv=None, job=False):
     parser = argparse.ArgumentParser(
         description='Othello Computer Vision Demo - Process videos and images of Othello games',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -32,6 +65,34 @@ Examples:
   # Process an image with debug visualizations
   python othello_demo.py --image uploads/board.png --board-size 4 --debug
 
+  # Cache decoded frames so repeated tuning runs skip video decoding
+  python othello_demo.py --video input.mov --board-size 4 --frame-cache --color-threshold 0.4
+
+  # Skip long think-time periods and sample densely around moves
+  python othello_demo.py --video input.mov --board-size 4 --adaptive-sampling
+
+  # Index positions across games, then find recordings that reached a position
+  python othello_demo.py --video game1.mov --board-size 4 --index positions.db
+  python othello_demo.py --query-position -----WB--BWB---W --index positions.db
+
+  # Compare time and peak memory with and without reused frame buffers
+  python othello_demo.py --video input.mov --board-size 4 --benchmark
+
+  # Train a learned cell classifier and use it instead of the colour rule
+  python othello_classifier.py train --labels docs/assets/data/test-results.json --output cells.pkl
+  python othello_demo.py --video input.mov --board-size 4 --classifier cells.pkl
+
+  # Process a long recording in 8 parallel time ranges
+  python othello_demo.py --video long-game.mp4 --board-size 8 --chunks 8
+
+  # Keep a warm server and submit jobs with the thin client
+  python othello_demo.py --serve /tmp/othello-cv.sock &
+  python othello_client.py --socket /tmp/othello-cv.sock --image board.png --board-size 4
+
+  # Tune parameters against a known move list, then reuse the chosen config
+  python othello_demo.py --video input.mov --board-size 4 --autotune truth.json --output tuning/
+  python othello_demo.py --video other.mov --board-size 4 --config tuning/othello_cv_config.json
+
   # Process video and save all outputs
   python othello_demo.py --video input.mov --board-size 8 --json --annotate --debug --output results/
         """
@@ -49,6 +110,18 @@ Examples:
         type=str,
         help='Path to image file to process'
     )
+    input_group.add_argument(
+        '--serve',
+        type=str,
+        metavar='SOCKET',
+        help='Run a warm server on a Unix socket for othello_client.py'
+    )
+    input_group.add_argument(
+        '--query-position',
+        type=str,
+        metavar='STATE',
+        help='List recordings in --index that reached a position (any rotation/reflection)'
+    )
 
     # Configuration options
     parser.add_argument(
@@ -58,18 +131,111 @@ Examples:
         default=4,
         help='Board size (4 for GamesmanUni, 8 for standard Othello) [default: 4]'
     )
+    parser.add_argument(
+        '--config', '-c',
+        type=str,
+        help='Load parameters from a config file (e.g. written by --autotune); '
+             'explicit options below override it'
+    )
     parser.add_argument(
         '--skip-frames',
         type=int,
-        default=20,
         help='Number of frames to skip in video processing [default: 20]'
     )
     parser.add_argument(
         '--color-threshold',
         type=float,
-        default=0.3,
         help='Threshold for piece color detection (0-1) [default: 0.3]'
     )
+    parser.add_argument(
+        '--motion-threshold',
+        type=int,
+        help='Threshold for motion detection [default: 10]'
+    )
+    parser.add_argument(
+        '--resize-width',
+        type=int,
+        help='Width to resize frames to before detection [default: 500]'
+    )
+
+    parser.add_argument(
+        '--adaptive-sampling',
+        action='store_true',
+        default=None,
+        help='Sample sparsely while the board is static and densely during motion'
+    )
+    parser.add_argument(
+        '--max-skip-frames',
+        type=int,
+        help='Largest frame skip for --adaptive-sampling [default: 8 x skip frames]'
+    )
+    parser.add_argument(
+        '--settle-frames',
+        type=int,
+        help='Motion-free frames before --adaptive-sampling classifies [default: skip frames / 2]'
+    )
+
+    parser.add_argument(
+        '--frame-memo-size',
+        type=int,
+        help='Board fingerprints remembered to skip re-classifying identical frames, 0 to disable [default: 128]'
+    )
+    parser.add_argument(
+        '--classifier',
+        type=str,
+        metavar='MODEL',
+        help='Classify cells with a model trained by othello_classifier.py instead of the colour rule'
+    )
+
+    # Autotune options
+    parser.add_argument(
+        '--autotune',
+        type=str,
+        metavar='GROUND_TRUTH',
+        help='Sweep parameters for --video against a ground-truth move list '
+             '(JSON result or moves text file) and write the chosen config'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Parallel worker processes for --autotune [default: CPU count]'
+    )
+    parser.add_argument(
+        '--config-out',
+        type=str,
+        help='Config file written by --autotune [default: <output>/othello_cv_config.json]'
+    )
+
+    parser.add_argument(
+        '--chunks',
+        type=int,
+        default=1,
+        help='Split the video into N time ranges processed in parallel [default: 1]'
+    )
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help='Compare --video with and without reused frame buffers (time, RSS, per-frame allocations); '
+             'exits 1 if the reused-buffer loop allocates per frame'
+    )
+
+    # Frame cache options
+    parser.add_argument(
+        '--frame-cache',
+        action='store_true',
+        help='Decode the video once into a frame cache and reuse it on later runs'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='Frame cache directory [default: <video>.framecache]'
+    )
+    parser.add_argument(
+        '--cache-stride',
+        type=int,
+        default=5,
+        help='Cache every Nth frame; --skip-frames must be a multiple of it [default: 5]'
+    )
 
     # Output format options
     parser.add_argument(
@@ -82,6 +248,16 @@ Examples:
         action='store_true',
         help='Generate annotated video/image with detected pieces'
     )
+    parser.add_argument(
+        '--record', '-r',
+        type=str,
+        help='Append the result to a binary game-record file (e.g. games.othr)'
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        help='Add detected positions to a cross-game position index (e.g. positions.db)'
+    )
     parser.add_argument(
         '--debug', '-d',
         action='store_true',
@@ -94,7 +270,7 @@ Examples:
     )
 
     # Parse arguments
-    args = parser.parse_args()
+    args = parser.parse_args(_attach_position_values(sys.argv[1:] if argv is None else argv))
 
     # Setup output directory
     if args.output:
@@ -108,13 +284,56 @@ Examples:
         masks_dir = Path('masks')
         masks_dir.mkdir(exist_ok=True)
 
-    # Initialize CV processor
-    print(f"Initializing Othello CV with board size: {args.board_size}x{args.board_size}")
-    processor = OthelloCV(
-        board_size=args.board_size,
-        skip_frames=args.skip_frames,
-        color_threshold=args.color_threshold
-    )
+    # Serve jobs from othello_client.py instead of processing input
+    if args.serve:
+        if job:
+            parser.error('--serve cannot be submitted as a job')
+        run_server(args.serve)
+        return
+
+    # Answer a position query instead of processing input
+    if args.query_position:
+        if not args.index:
+            parser.error('--query-position requires --index')
+        run_query(args)
+        return
+
+    # Run the parameter sweep instead of a single analysis
+    if args.autotune:
+        if not args.video:
+            parser.error('--autotune requires --video')
+        run_autotune(args, output_dir)
+        return
+
+    if args.benchmark and not args.video:
+        parser.error('--benchmark requires --video')
+
+    try:
+        # Collect parameters from the config file and explicit options
+        params = load_config(args.config) if args.config else {}
+        for name in TUNABLE_PARAMETERS:
+            value = getattr(args, name)
+            if value is not None:
+                params[name] = value
+        if args.classifier:
+            params['classifier'] = args.classifier
+
+        # Measure the video loop instead of reporting moves
+        if args.benchmark:
+            run_benchmark(args, params)
+            return
+
+        # Initialize CV processor
+        print(f"Initializing Othello CV with board size: {args.board_size}x{args.board_size}")
+        processor = get_processor(args.board_size, params)
+        processor_params = {name: getattr(processor, name) for name in TUNABLE_PARAMETERS}
+
+    except Exception as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        if args.debug:
+            import traceback
+            traceback.print_exc()
+        sys.exit(1)
 
     # Process input
     start_time = time.time()
@@ -122,8 +341,8 @@ Examples:
     try:
         if args.video:
             print(f"\nProcessing video: {args.video}")
-            print(f"Skip frames: {args.skip_frames}")
-            print(f"Color threshold: {args.color_threshold}")
+            print(f"Skip frames: {processor.skip_frames}")
+            print(f"Color threshold: {processor.color_threshold}")
             print("-" * 60)
 
             # Check if file exists
@@ -138,12 +357,39 @@ Examples:
                 output_video_path = str(output_dir / f"{video_name}_annotated.mp4")
                 print(f"Annotated video will be saved to: {output_video_path}")
 
+            # Load or build the frame cache if requested
+            frame_cache = None
+            if args.frame_cache:
+                frame_cache = FrameCache.open(
+                    args.video,
+                    cache_dir=args.cache_dir,
+                    width=processor.resize_width,
+                    stride=args.cache_stride
+                )
+                print(f"Using frame cache: {frame_cache.cache_dir} ({len(frame_cache)} frames)")
+
+            # Index positions as moves are detected
+            position_index = None
+            on_move = None
+            if args.index:
+                position_index = PositionIndex(args.index)
+                on_move = position_index.recorder(args.video, args.board_size)
+
             # Process video
-            result = processor.process_video(
-                args.video,
-                save_debug=args.debug,
-                output_video_path=output_video_path
-            )
+            try:
+                result = processor.process_video(
+                    args.video,
+                    save_debug=args.debug,
+                    output_video_path=output_video_path,
+                    frame_cache=frame_cache,
+                    on_move=on_move,
+                    chunks=args.chunks
+                )
+            finally:
+                if position_index:
+                    position_index.close()
+            if args.index:
+                print(f"Positions indexed in: {args.index}")
 
             # Output results
             processing_time = time.time() - start_time
@@ -152,6 +398,8 @@ Examples:
             print(f"\nProcessing complete!")
             print(f"Total moves detected: {result['total_moves']}")
             print(f"Total frames processed: {result['total_frames']}")
+            print(f"Frames classified: {result['classified_frames']} ({result['sampling']} sampling)")
+            print(f"Fingerprint memo hit rate: {result['frame_memo']['hit_rate']:.1%}")
             print(f"Processing time: {processing_time:.2f}s")
             print("-" * 60)
 
@@ -170,6 +418,12 @@ Examples:
                     f.write(processor.format_moves_as_json(result, pretty=True))
                 print(f"\nJSON output saved to: {json_path}")
 
+            # Append to binary game-record file
+            if args.record:
+                with RecordWriter(args.record, args.board_size, parameters=processor_params, append=True) as writer:
+                    game_index = writer.write_game(result)
+                print(f"Game record {game_index} appended to: {args.record}")
+
             # Save text output
             text_path = output_dir / f"{Path(args.video).stem}_moves.txt"
             with open(text_path, 'w') as f:
@@ -187,7 +441,7 @@ Examples:
 
         elif args.image:
             print(f"\nProcessing image: {args.image}")
-            print(f"Color threshold: {args.color_threshold}")
+            print(f"Color threshold: {processor.color_threshold}")
             print("-" * 60)
 
             # Check if file exists
@@ -224,6 +478,18 @@ Examples:
                     f.write(processor.format_moves_as_json(result, pretty=True))
                 print(f"\nJSON output saved to: {json_path}")
 
+            # Append to binary game-record file
+            if args.record:
+                with RecordWriter(args.record, args.board_size, parameters=processor_params, append=True) as writer:
+                    game_index = writer.write_game(result)
+                print(f"Game record {game_index} appended to: {args.record}")
+
+            # Add position to index
+            if args.index:
+                with PositionIndex(args.index) as position_index:
+                    position_index.add_game(result)
+                print(f"Position indexed in: {args.index}")
+
             # Save annotated image
             if args.annotate:
                 import cv2
@@ -265,5 +531,224 @@ Examples:
         sys.exit(1)
 
 
+class _SocketStream:
+    """File-like object forwarding writes to an othello_client.py connection."""
+
+    def __init__(self, sock, stream: str):
+        self.sock = sock
+        self.stream = stream
+
+    def write(self, data: str) -> int:
+        if data:
+            send_message(self.sock, {"stream": self.stream, "data": data})
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def _run_job(conn):
+    """Run one client command in a forked child with output sent to the client."""
+    request = next(read_messages(conn.makefile('r', encoding='utf-8')))
+    sys.stdout = _SocketStream(conn, 'stdout')
+    sys.stderr = _SocketStream(conn, 'stderr')
+
+    exit_code = 0
+    try:
+        os.chdir(request.get('cwd', '.'))
+        # Checked on the parsed arguments, so abbreviations are caught too
+        main(request['argv'], job=True)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        exit_code = 1
+
+    send_message(conn, {"exit": exit_code})
+
+
+def run_server(socket_path: str):
+    """
+    Serve othello_demo.py commands over a Unix socket.
+
+    The server imports OpenCV once and keeps warm OthelloCV instances; each
+    job runs in a forked child so working directory, output redirection and
+    exits stay isolated while start-up cost is paid only once.
+    """
+    import signal
+    import socket
+    import numpy as np
+
+    # Pay one-time OpenCV initialisation and construct default processors
+    for board_size in (4, 8):
+        get_processor(board_size, {}).process_frame(np.zeros((400, 400, 3), dtype=np.uint8))
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    # Reap finished job processes automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print(f"Othello CV server listening on: {socket_path}")
+    print(f"Submit jobs with: python othello_client.py --socket {socket_path} [options]")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            if os.fork() == 0:
+                server.close()
+                try:
+                    _run_job(conn)
+                finally:
+                    conn.close()
+                    os._exit(0)
+            conn.close()
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    finally:
+        server.close()
+        os.remove(socket_path)
+
+
+def run_query(args):
+    """Print every indexed recording that reached a position."""
+    with PositionIndex(args.index) as position_index:
+        start_time = time.perf_counter()
+        try:
+            matches = position_index.query(args.query_position)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        query_time = time.perf_counter() - start_time
+
+    print(f"Position: {args.query_position}")
+    print(f"Found {len(matches)} occurrence(s) in {query_time * 1000:.1f}ms")
+    print("-" * 60)
+    for match in matches:
+        print(f"  Game {match['game']}: {match['source']} - "
+              f"move {match['move']} (frame {match['frame']}) {match['state']}")
+
+
+# --benchmark fails when the reused-buffer loop allocates more than this
+BENCHMARK_RETAINED_LIMIT = 4096         # bytes retained per sampled frame
+BENCHMARK_TRANSIENT_LIMIT = 64 * 1024   # bytes of transient peak
+
+
+def _benchmark_mode(video_path: str, board_size: int, params: dict) -> dict:
+    """Time and profile one buffer mode (runs in a fresh process for a clean RSS)."""
+    import resource
+
+    processor = OthelloCV(board_size=board_size, **params)
+
+    # Warm-up run allocates the buffers and fills the fingerprint memo
+    processor.process_video(video_path)
+
+    start_time = time.perf_counter()
+    result = processor.process_video(video_path)
+    elapsed = time.perf_counter() - start_time
+
+    profile = processor.profile_allocations(video_path)
+    # ru_maxrss is in KiB on Linux
+    profile['max_rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    profile['fps'] = result['total_frames'] / max(elapsed, 1e-6)
+    profile['elapsed'] = elapsed
+    return profile
+
+
+def run_benchmark(args, params: dict):
+    """Compare process_video with and without reused frame buffers."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not os.path.exists(args.video):
+        print(f"Error: Video file not found: {args.video}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Benchmarking: {args.video}")
+    print("-" * 60)
+
+    profiles = {}
+    for reuse_buffers in (False, True):
+        # A spawned process per mode, so peak RSS is not shared between them
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            profile = executor.submit(
+                _benchmark_mode, args.video, args.board_size,
+                {**params, 'reuse_buffers': reuse_buffers}
+            ).result()
+        profiles[reuse_buffers] = profile
+
+        label = 'reused buffers' if reuse_buffers else 'fresh buffers'
+        print(f"  {label:<15} {profile['elapsed']:6.2f}s  {profile['fps']:8.1f} fps  "
+              f"max RSS {profile['max_rss_kib'] / 1024:7.1f} MiB  "
+              f"retained {profile['retained_bytes_per_frame']:9.1f} B/frame  "
+              f"transient peak {profile['transient_peak_bytes'] / 1024:8.1f} KiB")
+
+    rss_gain = profiles[False]['max_rss_kib'] - profiles[True]['max_rss_kib']
+    print(f"\nMax RSS saved by reused buffers: {rss_gain / 1024:.1f} MiB")
+    print(f"(allocations measured over {profiles[True]['sampled_frames']} sampled frames after as many warm-up frames)")
+
+    reused = profiles[True]
+    if (reused['retained_bytes_per_frame'] > BENCHMARK_RETAINED_LIMIT or
+            reused['transient_peak_bytes'] > BENCHMARK_TRANSIENT_LIMIT):
+        print(f"\nFAIL: reused-buffer loop allocates per frame "
+              f"(limits: {BENCHMARK_RETAINED_LIMIT} B/frame retained, "
+              f"{BENCHMARK_TRANSIENT_LIMIT // 1024} KiB transient)", file=sys.stderr)
+        for site in reused['top_sites']:
+            print(f"  {site}", file=sys.stderr)
+        sys.exit(1)
+    print("PASS: steady-state allocations within limits")
+
+
+def run_autotune(args, output_dir: Path):
+    """Sweep parameters for a video and save the chosen config."""
+    from othello_autotune import autotune, load_ground_truth
+
+    if not os.path.exists(args.video):
+        print(f"Error: Video file not found: {args.video}", file=sys.stderr)
+        sys.exit(1)
+
+    expected = load_ground_truth(args.autotune, args.board_size)
+    print(f"Autotuning on: {args.video}")
+    print(f"Ground truth: {args.autotune} ({len(expected)} moves)")
+    print("-" * 60)
+
+    start_time = time.time()
+    result = autotune(
+        args.video,
+        expected,
+        board_size=args.board_size,
+        workers=args.workers,
+        cache_dir=args.cache_dir
+    )
+    processing_time = time.time() - start_time
+
+    print(f"\nAutotune complete! {result['total_trials']} trials in {processing_time:.2f}s")
+    print("\nPareto front (accuracy vs cached-frame throughput, excluding decoding):")
+    for trial in result['pareto_front']:
+        params = ', '.join(f"{k}={v}" for k, v in trial['parameters'].items())
+        print(f"  accuracy {trial['accuracy']:.3f}  {trial['cached_fps']:>9.1f} cached fps  {params}")
+
+    # Save all trials and the chosen config
+    json_path = output_dir / f"{Path(args.video).stem}_autotune.json"
+    with open(json_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\nTrial results saved to: {json_path}")
+
+    config_path = args.config_out or str(output_dir / 'othello_cv_config.json')
+    best = result['best']
+    save_config(result['config'], config_path, metadata={
+        "video_path": args.video,
+        "board_size": args.board_size,
+        "accuracy": best['accuracy'],
+        "cached_fps": best['cached_fps'],
+        "motion_scale": result['motion_scale']
+    })
+    print(f"Chosen config saved to: {config_path}")
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,293 @@
+"""
+Othello Frame Cache
+===================
+Decode-once cache of downsampled video frames for repeated analysis runs.
+
+A cache directory holds:
+    frames.npy  - uint8 array (N, H, W, 3) of sampled BGR frames, memory-mapped on load
+    index.npy   - structured array of (frame, timestamp, motion) for each cached frame
+    meta.json   - source file fingerprint and cache parameters
+
+Frame numbers follow the convention of OthelloCV.process_video: the first
+decoded frame is the motion reference (stored as frame -1) and frame 0 is
+the frame after it. Motion detection on cached frames runs at the cached
+resolution, so results can differ slightly from decoding a larger source.
+"""
+
+import os
+import json
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+CACHE_VERSION = 1
+
+INDEX_DTYPE = np.dtype([
+    ('frame', '<i8'),
+    ('timestamp', '<f8'),
+    ('motion', '<f8'),
+])
+
+# Bytes reserved for the .npy header so frames can be streamed to disk
+# before the final frame count is known
+_NPY_HEADER_SIZE = 256
+
+
+def _source_fingerprint(video_path: str) -> Dict:
+    """Identify a source file by path, size and modification time."""
+    stat = os.stat(video_path)
+    return {
+        "path": os.path.abspath(video_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def _write_npy_header(f, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+    """Write a fixed-size version 1.0 .npy header at the start of a file."""
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': shape,
+    })
+    # Magic string (8 bytes) + header length (2 bytes) + padded header text
+    text_size = _NPY_HEADER_SIZE - 10
+    header = header.ljust(text_size - 1) + '\n'
+    if len(header) != text_size:
+        raise ValueError(f"Frame cache header too large for shape {shape}")
+
+    f.seek(0)
+    f.write(b'\x93NUMPY\x01\x00')
+    f.write(np.uint16(text_size).tobytes())
+    f.write(header.encode('latin1'))
+
+
+def _blurred_gray(frame: np.ndarray) -> np.ndarray:
+    """Grayscale and blur a frame the same way OthelloCV does for motion."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(gray, (21, 21), 0)
+
+
+def _motion_level(previous_gray: np.ndarray, current_gray: np.ndarray) -> float:
+    """Motion score between two blurred grayscale frames."""
+    frame_delta = cv2.absdiff(previous_gray, current_gray)
+    thresholded = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
+    return float(np.sum(thresholded))
+
+
+class FrameCache:
+    """
+    Memory-mapped cache of downsampled, sampled video frames.
+
+    Attributes:
+        cache_dir (str): Directory holding the cache files
+        width (int): Requested width of the cached frames (smaller sources
+            are cached at their own width)
+        stride (int): Cached every `stride`-th frame
+        total_frames (int): Frame count seen by process_video for the source
+        frames (np.ndarray): Read-only memory-mapped frames (N, H, W, 3)
+        index (np.ndarray): Structured array with frame, timestamp and motion
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Load an existing frame cache.
+
+        Args:
+            cache_dir: Directory containing frames.npy, index.npy and meta.json
+        """
+        meta_path = os.path.join(cache_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            raise ValueError(f"No frame cache found in: {cache_dir}")
+
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+
+        self.cache_dir = cache_dir
+        self.width = self.meta['width']
+        self.stride = self.meta['stride']
+        self.total_frames = self.meta['total_frames']
+        self.frames = np.load(os.path.join(cache_dir, 'frames.npy'), mmap_mode='r')
+        self.index = np.load(os.path.join(cache_dir, 'index.npy'))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @staticmethod
+    def default_cache_dir(video_path: str) -> str:
+        """Cache directory used when none is given: next to the video."""
+        return f"{video_path}.framecache"
+
+    @classmethod
+    def open(
+        cls,
+        video_path: str,
+        cache_dir: Optional[str] = None,
+        width: int = 500,
+        stride: int = 5
+    ) -> 'FrameCache':
+        """
+        Load the cache for a video, rebuilding it if missing or stale.
+
+        Args:
+            video_path: Path to the source video
+            cache_dir: Cache directory (default: <video_path>.framecache)
+            width: Width to downsample cached frames to
+            stride: Cache every `stride`-th frame
+
+        Returns:
+            FrameCache for the video
+        """
+        cache_dir = cache_dir or cls.default_cache_dir(video_path)
+        try:
+            cache = cls(cache_dir)
+        except (ValueError, OSError):
+            return cls.build(video_path, cache_dir, width=width, stride=stride)
+
+        if not cache.is_valid_for(video_path, width=width, stride=stride):
+            return cls.build(video_path, cache_dir, width=width, stride=stride)
+        return cache
+
+    @classmethod
+    def build(
+        cls,
+        video_path: str,
+        cache_dir: Optional[str] = None,
+        width: int = 500,
+        stride: int = 5
+    ) -> 'FrameCache':
+        """
+        Decode a video once and write its sampled frames to a cache.
+
+        Args:
+            video_path: Path to the source video
+            cache_dir: Cache directory (default: <video_path>.framecache)
+            width: Width to downsample cached frames to
+            stride: Cache every `stride`-th frame
+
+        Returns:
+            FrameCache for the video
+        """
+        if stride < 1:
+            raise ValueError("Cache stride must be at least 1")
+
+        cache_dir = cache_dir or cls.default_cache_dir(video_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Remove stale metadata first so an interrupted build is never loaded
+        meta_path = os.path.join(cache_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+
+        ret, first_frame = cap.read()
+        if not ret:
+            cap.release()
+            raise ValueError("Could not read first frame from video")
+
+        # Match the size OthelloCV.process_frame resizes to, but never
+        # upscale: motion detection on enlarged frames is more sensitive
+        src_h, src_w = first_frame.shape[:2]
+        scale = min(width, src_w) / src_w
+        size = (int(src_w * scale), int(src_h * scale))
+
+        entries = []
+        frame_count = 0
+
+        with open(os.path.join(cache_dir, 'frames.npy'), 'wb') as f:
+            f.seek(_NPY_HEADER_SIZE)
+
+            small = cv2.resize(first_frame, size, interpolation=cv2.INTER_AREA)
+            previous_gray = _blurred_gray(small)
+            f.write(small.tobytes())
+            entries.append((-1, cap.get(cv2.CAP_PROP_POS_MSEC), 0.0))
+
+            while True:
+                # Skip colour conversion for frames that are not cached
+                if frame_count % stride != 0:
+                    if not cap.grab():
+                        break
+                    frame_count += 1
+                    continue
+
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                gray = _blurred_gray(small)
+                f.write(small.tobytes())
+                entries.append((
+                    frame_count,
+                    cap.get(cv2.CAP_PROP_POS_MSEC),
+                    _motion_level(previous_gray, gray)
+                ))
+                previous_gray = gray
+                frame_count += 1
+
+            _write_npy_header(f, (len(entries), size[1], size[0], 3), np.dtype(np.uint8))
+
+        cap.release()
+
+        np.save(os.path.join(cache_dir, 'index.npy'), np.array(entries, dtype=INDEX_DTYPE))
+
+        meta = {
+            "version": CACHE_VERSION,
+            "source": _source_fingerprint(video_path),
+            "width": width,
+            "stride": stride,
+            "total_frames": frame_count
+        }
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        return cls(cache_dir)
+
+    def is_valid_for(self, video_path: str, width: int, stride: int) -> bool:
+        """
+        Check whether the cache matches a source video and parameters.
+
+        Args:
+            video_path: Path to the source video
+            width: Expected cached frame width
+            stride: Expected cache stride
+
+        Returns:
+            True if the source is unchanged and parameters match
+        """
+        try:
+            source = _source_fingerprint(video_path)
+        except OSError:
+            return False
+
+        return (
+            self.meta.get('version') == CACHE_VERSION and
+            self.meta.get('source') == source and
+            self.width == width and
+            self.stride == stride
+        )
+
+    def first_frame(self) -> Optional[np.ndarray]:
+        """Return the motion reference frame (zero-copy view)."""
+        if len(self.index) == 0 or self.index['frame'][0] != -1:
+            return None
+        return self.frames[0]
+
+    def next_frame(self, target: int) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Return the first cached frame at or after a frame number.
+
+        Args:
+            target: Frame number to seek to
+
+        Returns:
+            (frame number, zero-copy frame view), or None past the end
+        """
+        position = int(np.searchsorted(self.index['frame'], target))
+        if position >= len(self.index):
+            return None
+        return int(self.index['frame'][position]), self.frames[position]
@@ -0,0 +1,227 @@
+"""
+Othello Position Index
+======================
+On-disk index answering "which recordings reached this position?".
+
+Positions are stored under a canonical key: the smallest packed encoding
+among the 8 rotations and reflections of the board, so a query matches
+every recording that reached the position in any orientation. The index
+is a SQLite database, so it can be built incrementally and shared between
+runs.
+"""
+
+import sqlite3
+import itertools
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+from othello_records import states_to_codes, pack_codes, unpack_positions, codes_to_states
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    board_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    board_size INTEGER NOT NULL,
+    canonical BLOB NOT NULL,
+    position BLOB NOT NULL,
+    game INTEGER NOT NULL REFERENCES games(id),
+    move INTEGER NOT NULL,
+    frame INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS positions_by_key ON positions (board_size, canonical);
+"""
+
+
+def symmetries(codes: np.ndarray, board_size: int) -> np.ndarray:
+    """
+    Return the 8 rotations and reflections of positions.
+
+    Args:
+        codes: Cell codes (moves, cells) in position-string order
+        board_size: Board dimensions
+
+    Returns:
+        Cell codes (8, moves, cells)
+    """
+    boards = codes.reshape(-1, board_size, board_size)
+    transposed = boards.transpose(0, 2, 1)
+    variants = [np.rot90(b, k, axes=(1, 2)) for b in (boards, transposed) for k in range(4)]
+    return np.stack(variants).reshape(8, len(codes), -1)
+
+
+def canonical_keys(states: List[str], board_size: int) -> List[bytes]:
+    """
+    Compute symmetry-reduced keys for position strings.
+
+    Args:
+        states: Position strings
+        board_size: Board dimensions
+
+    Returns:
+        One packed key per position, identical for all 8 symmetric variants
+    """
+    if not states:
+        return []
+    variants = symmetries(states_to_codes(states, board_size), board_size)
+    packed = pack_codes(variants.reshape(-1, board_size * board_size))
+    packed = packed.reshape(8, len(states), -1)
+    return [min(bytes(variant) for variant in packed[:, i]) for i in range(len(states))]
+
+
+class PositionIndex:
+    """
+    Cross-game index from canonical positions to (game, move, frame).
+
+    Use as a context manager to commit on exit.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) an index database.
+
+        Args:
+            path: Path to the SQLite index file
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'PositionIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        self.connection.commit()
+        self.connection.close()
+
+    def begin_game(self, source: str, board_size: int) -> int:
+        """
+        Register a new game.
+
+        Args:
+            source: Video or image path the game came from
+            board_size: Board dimensions
+
+        Returns:
+            Game id
+        """
+        cursor = self.connection.execute(
+            "INSERT INTO games (source, board_size) VALUES (?, ?)", (source, board_size)
+        )
+        return cursor.lastrowid
+
+    def add_moves(self, game_id: int, board_size: int, moves: List[Dict], first_move: int = 1) -> None:
+        """
+        Index moves of a game.
+
+        Args:
+            game_id: Id from begin_game
+            board_size: Board dimensions
+            moves: Move dictionaries with "state" and "frame"
+            first_move: Move number of the first entry in moves
+        """
+        states = [move['state'] for move in moves]
+        keys = canonical_keys(states, board_size)
+        positions = pack_codes(states_to_codes(states, board_size)) if states else []
+        self.connection.executemany(
+            "INSERT INTO positions (board_size, canonical, position, game, move, frame) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (board_size, key, position.tobytes(), game_id, number, move['frame'])
+                for number, (key, position, move) in enumerate(zip(keys, positions, moves), first_move)
+            ]
+        )
+
+    def recorder(self, source: str, board_size: int) -> Callable[[Dict], None]:
+        """
+        Create a callback that indexes moves as process_video emits them.
+
+        Args:
+            source: Video path the moves come from
+            board_size: Board dimensions
+
+        Returns:
+            Function to pass as process_video(on_move=...)
+        """
+        game_id = self.begin_game(source, board_size)
+        move_numbers = itertools.count(1)
+
+        def record(move: Dict) -> None:
+            self.add_moves(game_id, board_size, [move], first_move=next(move_numbers))
+
+        return record
+
+    def add_game(self, result: Dict, source: Optional[str] = None) -> int:
+        """
+        Index a complete result from process_video or a game record.
+
+        Args:
+            result: Result dictionary with "board_size" and "moves"
+            source: Game source (default: the result's video_path)
+
+        Returns:
+            Game id
+        """
+        source = source or result.get('video_path') or result.get('image_path', '')
+        if 'moves' in result:
+            moves = result['moves']
+        else:
+            moves = [{"state": result['state'], "frame": 0}]
+        game_id = self.begin_game(source, result['board_size'])
+        self.add_moves(game_id, result['board_size'], moves)
+        return game_id
+
+    def query(self, state: str) -> List[Dict]:
+        """
+        Find every recorded occurrence of a position or its symmetries.
+
+        Args:
+            state: Position string (16 cells for 4x4, 64 for 8x8)
+
+        Returns:
+            List of matches with game id, source, move number, frame and
+            the position as recorded
+        """
+        board_size = int(round(len(state) ** 0.5))
+        if board_size not in [4, 8] or board_size * board_size != len(state):
+            raise ValueError("Position must have 16 (4x4) or 64 (8x8) cells")
+        if set(state) - set('BW-'):
+            raise ValueError("Position may only contain 'B', 'W' and '-'")
+
+        key = canonical_keys([state], board_size)[0]
+        rows = self.connection.execute(
+            "SELECT p.game, g.source, p.move, p.frame, p.position "
+            "FROM positions p JOIN games g ON g.id = p.game "
+            "WHERE p.board_size = ? AND p.canonical = ? "
+            "ORDER BY p.game, p.move",
+            (board_size, key)
+        ).fetchall()
+
+        return [
+            {
+                "game": game,
+                "source": source,
+                "move": move,
+                "frame": frame,
+                "state": _unpack_state(position, board_size)
+            }
+            for game, source, move, frame, position in rows
+        ]
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+
+def _unpack_state(position: bytes, board_size: int) -> str:
+    """Convert a packed position back into a position string."""
+    packed = np.frombuffer(position, dtype=np.uint8)
+    return codes_to_states(unpack_positions(packed, board_size))[0]
@@ -0,0 +1,497 @@
+"""
+Othello Game Records
+====================
+Compact binary format for storing many processed games in one file.
+
+Layout (little-endian):
+    File header:  magic 'OTHR', version (u8), board_size (u8),
+                  parameters length (u32), parameters JSON
+    Game record:  move count (u32), total frames (u32), deltas length (u32),
+                  metadata length (u32), metadata JSON,
+                  one varint per move: (frame delta << 2) | player,
+                  packed positions: 2 bits per cell, 4 cells per byte
+    Index:        one u64 offset per game record
+    Footer:       index offset (u64), game count (u32), magic 'OTHR'
+
+Cells are packed in position-string order (0 = empty, 1 = black, 2 = white),
+so a whole corpus can be loaded into NumPy arrays without parsing JSON.
+
+Appending writes new game records after the existing footer and then a new
+index and footer, so the previous index stays valid until the append is
+complete. Readers use the last complete footer in the file. Games written
+with parameters that differ from the header store them in their metadata.
+
+Usage:
+    python othello_records.py games.othr results/*_result.json
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+MAGIC = b'OTHR'
+FORMAT_VERSION = 1
+RECORD_EXTENSION = '.othr'
+
+_FILE_HEADER = struct.Struct('<4sBBI')
+_GAME_HEADER = struct.Struct('<IIII')
+_FOOTER = struct.Struct('<QI4s')
+
+# Position string characters by cell code, and cell codes by character
+_CELL_CHARS = np.frombuffer(b'-BW', dtype=np.uint8)
+_CELL_CODES = np.zeros(256, dtype=np.uint8)
+_CELL_CODES[ord('B')] = 1
+_CELL_CODES[ord('W')] = 2
+
+# Grid values (1 = black, -1 = white, 0 = empty) by cell code
+_CELL_VALUES = np.array([0, 1, -1], dtype=np.int8)
+
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+def _encode_varints(values: List[int]) -> bytes:
+    """Encode non-negative integers as LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: np.ndarray) -> np.ndarray:
+    """Decode a uint8 array of concatenated LEB128 varints (vectorized)."""
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    ends = data < 0x80
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    # Byte position within its varint gives the shift for its 7 bits
+    position = np.arange(len(data)) - np.repeat(starts, np.diff(np.append(starts, len(data))))
+    chunks = (data & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(chunks, starts)
+
+
+def states_to_codes(states: List[str], board_size: int) -> np.ndarray:
+    """Convert position strings to cell codes (moves, cells)."""
+    cells = board_size * board_size
+    chars = np.frombuffer(''.join(states).encode('ascii'), dtype=np.uint8)
+    if len(chars) != len(states) * cells:
+        raise ValueError(f"Position strings must have {cells} cells for a {board_size}x{board_size} board")
+    return _CELL_CODES[chars].reshape(len(states), cells)
+
+
+def pack_codes(codes: np.ndarray) -> np.ndarray:
+    """Pack cell codes (moves, cells) at 2 bits per cell into (moves, cells / 4) bytes."""
+    codes = codes.reshape(len(codes), -1, 4) << _SHIFTS
+    return np.bitwise_or.reduce(codes, axis=2).astype(np.uint8)
+
+
+def pack_positions(states: List[str], board_size: int) -> bytes:
+    """Pack position strings at 2 bits per cell."""
+    if not states:
+        return b''
+    return pack_codes(states_to_codes(states, board_size)).tobytes()
+
+
+def unpack_positions(packed: np.ndarray, board_size: int) -> np.ndarray:
+    """Unpack 2-bit cells into an array of cell codes (moves, cells)."""
+    cells = board_size * board_size
+    codes = (packed.reshape(-1, cells // 4, 1) >> _SHIFTS) & 0x03
+    return codes.reshape(-1, cells)
+
+
+def codes_to_states(codes: np.ndarray) -> List[str]:
+    """Convert cell codes (moves, cells) to position strings."""
+    chars = _CELL_CHARS[codes]
+    return [row.tobytes().decode('ascii') for row in chars]
+
+
+def codes_to_grids(codes: np.ndarray, board_size: int) -> np.ndarray:
+    """
+    Convert cell codes to board grids in OthelloCV orientation.
+
+    Position strings are column-first, so the grid is transposed back to
+    grid[row, col] with 1 = black, -1 = white, 0 = empty.
+    """
+    values = _CELL_VALUES[codes].reshape(-1, board_size, board_size)
+    return values.transpose(0, 2, 1)
+
+
+class RecordWriter:
+    """
+    Streaming writer for binary game-record files.
+
+    Use as a context manager; the index is written on close.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        board_size: int,
+        parameters: Optional[Dict] = None,
+        append: bool = False
+    ):
+        """
+        Open a record file for writing.
+
+        Args:
+            path: Output file path
+            board_size: Board dimensions (4 or 8) for every game in the file
+            parameters: OthelloCV parameters stored in the file header
+                (when appending with different parameters, each new game
+                stores them in its metadata instead)
+            append: Add games to an existing file instead of replacing it
+        """
+        if board_size not in [4, 8]:
+            raise ValueError("Board size must be 4 or 8")
+
+        self.path = path
+        self.board_size = board_size
+        self.offsets = []
+        self.game_parameters = None
+
+        if append and os.path.exists(path):
+            reader = RecordReader(path)
+            if reader.board_size != board_size:
+                raise ValueError(f"Record file {path} holds {reader.board_size}x"
+                                 f"{reader.board_size} games, not {board_size}x{board_size}")
+            self.offsets = list(reader.offsets)
+            if parameters is not None and json.loads(json.dumps(parameters)) != reader.parameters:
+                self.game_parameters = parameters
+            end = reader.end
+            reader.close()
+
+            # Keep the old index and footer: until close() writes a new
+            # footer after the new games, readers still see the old one.
+            # Only bytes of an earlier interrupted append are dropped.
+            self.file = open(path, 'r+b')
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            params_json = json.dumps(parameters or {}).encode('utf-8')
+            self.file = open(path, 'wb')
+            self.file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, board_size, len(params_json)))
+            self.file.write(params_json)
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write_game(self, result: Dict) -> int:
+        """
+        Append one game.
+
+        Args:
+            result: Result dictionary from process_video, or from
+                process_image (stored as a single position at frame 0)
+
+        Returns:
+            Index of the game within the file
+        """
+        if result.get('board_size', self.board_size) != self.board_size:
+            raise ValueError(f"Cannot store a {result['board_size']}x{result['board_size']} "
+                             f"game in a {self.board_size}x{self.board_size} record file")
+
+        if 'moves' in result:
+            moves = result['moves']
+        else:
+            moves = [{"player": 0, "state": result['state'], "frame": 0}]
+
+        deltas = []
+        previous_frame = 0
+        for move in moves:
+            delta = move['frame'] - previous_frame
+            if delta < 0:
+                raise ValueError("Move frames must be non-decreasing")
+            deltas.append((delta << 2) | move['player'])
+            previous_frame = move['frame']
+
+        metadata = {
+            key: value for key, value in result.items()
+            if key not in ('moves', 'state', 'grid', 'board_size', 'total_moves', 'total_frames')
+        }
+        if self.game_parameters is not None:
+            metadata['parameters'] = self.game_parameters
+        meta_json = json.dumps(metadata).encode('utf-8')
+        deltas_bytes = _encode_varints(deltas)
+
+        self.offsets.append(self.file.tell())
+        self.file.write(_GAME_HEADER.pack(
+            len(moves), result.get('total_frames', 0), len(deltas_bytes), len(meta_json)
+        ))
+        self.file.write(meta_json)
+        self.file.write(deltas_bytes)
+        self.file.write(pack_positions([move['state'] for move in moves], self.board_size))
+        return len(self.offsets) - 1
+
+    def close(self) -> None:
+        """Write the game index and footer, then close the file."""
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.offsets, dtype='<u8').tobytes())
+        self.file.write(_FOOTER.pack(index_offset, len(self.offsets), MAGIC))
+        self.file.close()
+
+
+class RecordReader:
+    """
+    Reader for binary game-record files.
+
+    The file is memory-mapped; games can be streamed, read by index, or
+    loaded all at once into NumPy arrays.
+
+    Attributes:
+        board_size (int): Board dimensions of every game in the file
+        parameters (dict): OthelloCV parameters from the file header
+            (a game's own "parameters" metadata takes precedence)
+        offsets (np.ndarray): Byte offset of each game record
+        end (int): Byte after the footer in use; anything beyond it is an
+            interrupted append
+
+    After close(), reading raises ValueError.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a record file.
+
+        Args:
+            path: Path to a file written by RecordWriter
+        """
+        self.path = path
+        self.closed = True
+        if os.path.getsize(path) < _FILE_HEADER.size + _FOOTER.size:
+            raise ValueError(f"Not a game record file: {path}")
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = np.frombuffer(self._mmap, dtype=np.uint8)
+        self.closed = False
+
+        magic, version, board_size, params_length = _FILE_HEADER.unpack_from(self.data, 0)
+        footer = self._find_footer() if magic == MAGIC else None
+        if footer is None:
+            self.close()
+            raise ValueError(f"Not a game record file (or not closed properly): {path}")
+        index_offset, game_count, self.end = footer
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported game record version {version} in {path}")
+
+        self.board_size = board_size
+        self.bytes_per_position = board_size * board_size // 4
+        params_start = _FILE_HEADER.size
+        self.parameters = json.loads(self.data[params_start:params_start + params_length].tobytes())
+        self.index_offset = index_offset
+        self.offsets = self.data[index_offset:index_offset + 8 * game_count].view('<u8')
+
+    def _find_footer(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Find the last complete footer.
+
+        It is normally at the end of the file; after an interrupted append
+        it is the footer of the last completed write.
+
+        Returns:
+            Tuple of (index offset, game count, end of footer), or None
+        """
+        data = self.data
+        end = len(data)
+        header_end = _FILE_HEADER.size
+        while end >= header_end + _FOOTER.size:
+            index_offset, game_count, end_magic = _FOOTER.unpack_from(data, end - _FOOTER.size)
+            if (end_magic == MAGIC and header_end <= index_offset and
+                    index_offset + 8 * game_count == end - _FOOTER.size):
+                return index_offset, game_count, end
+            # Continue from the previous occurrence of the magic bytes
+            found = self._mmap.rfind(MAGIC, 0, end - 1)
+            if found < 0:
+                return None
+            end = found + len(MAGIC)
+        return None
+
+    def _check_open(self) -> None:
+        if self.closed:
+            raise ValueError(f"Game record file is closed: {self.path}")
+
+    def __len__(self) -> int:
+        self._check_open()
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self.read_game(i)
+
+    def __enter__(self) -> 'RecordReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map; later reads raise ValueError."""
+        if self.closed and not hasattr(self, '_mmap'):
+            return
+        self.closed = True
+        # Drop every view into the mapping before unmapping it
+        self.data = None
+        self.offsets = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view; the mapping is freed with it
+            pass
+        del self._mmap
+
+    def _game_sections(self, i: int):
+        """Return (move count, total frames, metadata, deltas, positions) slices for a game."""
+        self._check_open()
+        offset = int(self.offsets[i])
+        move_count, total_frames, deltas_length, meta_length = _GAME_HEADER.unpack_from(self.data, offset)
+
+        meta_start = offset + _GAME_HEADER.size
+        deltas_start = meta_start + meta_length
+        positions_start = deltas_start + deltas_length
+        positions_end = positions_start + move_count * self.bytes_per_position
+
+        return (
+            move_count,
+            total_frames,
+            self.data[meta_start:deltas_start],
+            self.data[deltas_start:positions_start],
+            self.data[positions_start:positions_end]
+        )
+
+    def read_game(self, i: int) -> Dict:
+        """
+        Read one game in the process_video result format.
+
+        Args:
+            i: Game index
+
+        Returns:
+            Dictionary with board_size, moves and stored metadata
+        """
+        move_count, total_frames, meta, deltas, positions = self._game_sections(i)
+
+        packed = _decode_varints(deltas)
+        frames = np.cumsum(packed >> 2)
+        players = packed & 0x03
+        states = codes_to_states(unpack_positions(positions, self.board_size))
+
+        result = {
+            "board_size": self.board_size,
+            "moves": [
+                {"player": int(player), "state": state, "frame": int(frame)}
+                for player, state, frame in zip(players, states, frames)
+            ],
+            "total_moves": move_count,
+            "total_frames": total_frames
+        }
+        result.update(json.loads(meta.tobytes()))
+        return result
+
+    def load_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Load every game into flat NumPy arrays without parsing JSON.
+
+        Returns:
+            Dictionary with:
+                positions: cell codes (moves, cells), 0/1/2 = empty/black/white
+                frames: frame number of each move
+                players: player of each move
+                game_offsets: start of each game in the move arrays (games + 1)
+                total_frames: total frames of each game
+        """
+        move_counts = np.zeros(len(self), dtype=np.int64)
+        total_frames = np.zeros(len(self), dtype=np.int64)
+        deltas_parts = []
+        positions_parts = []
+
+        for i in range(len(self)):
+            move_count, frames, _, deltas, positions = self._game_sections(i)
+            move_counts[i] = move_count
+            total_frames[i] = frames
+            deltas_parts.append(deltas)
+            positions_parts.append(positions)
+
+        game_offsets = np.concatenate(([0], np.cumsum(move_counts)))
+        packed = _decode_varints(np.concatenate(deltas_parts) if deltas_parts else np.zeros(0, np.uint8))
+        positions = np.concatenate(positions_parts) if positions_parts else np.zeros(0, np.uint8)
+
+        # Frame deltas restart at each game
+        running = np.cumsum(packed >> 2)
+        game_starts = np.repeat(game_offsets[:-1], move_counts)
+        before_game = np.concatenate(([0], running))[game_starts]
+
+        return {
+            "positions": unpack_positions(positions, self.board_size),
+            "frames": running - before_game,
+            "players": (packed & 0x03).astype(np.int8),
+            "game_offsets": game_offsets,
+            "total_frames": total_frames
+        }
+
+
+def convert_json_to_records(
+    json_paths: List[str],
+    output_path: str,
+    append: bool = False
+) -> int:
+    """
+    Convert JSON results from othello_demo.py into a record file.
+
+    Args:
+        json_paths: Paths to *_result.json files (all the same board size)
+        output_path: Record file to write
+        append: Add to an existing record file
+
+    Returns:
+        Number of games written
+    """
+    writer = None
+    try:
+        for json_path in json_paths:
+            with open(json_path) as f:
+                result = json.load(f)
+            if writer is None:
+                writer = RecordWriter(output_path, result['board_size'], append=append)
+            writer.write_game(result)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return len(json_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert Othello CV JSON results into a binary game-record file'
+    )
+    parser.add_argument('output', type=str, help=f'Record file to write (e.g. games{RECORD_EXTENSION})')
+    parser.add_argument('inputs', nargs='+', help='JSON result files from othello_demo.py')
+    parser.add_argument('--append', action='store_true', help='Append to an existing record file')
+    args = parser.parse_args()
+
+    try:
+        count = convert_json_to_records(args.inputs, args.output, append=args.append)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Wrote {count} games to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -32,10 +32,10 @@ run_test() {
 
     if eval "$command"; then
         echo "✓ PASSED: $test_name"
-        ((TESTS_PASSED++))
+        TESTS_PASSED=$((TESTS_PASSED + 1))
     else
         echo "✗ FAILED: $test_name"
-        ((TESTS_FAILED++))
+        TESTS_FAILED=$((TESTS_FAILED + 1))
     fi
     echo ""
 }
@@ -130,6 +130,37 @@ else
     echo "⚠ Skipping GamesmanUni full video test - file not found"
 fi
 
+if [ -f "uploads/export-othello-gamesmanuni-full.mp4" ]; then
+    run_test "Benchmark - Steady-State Allocations" \
+        "python3 othello_demo.py --video uploads/export-othello-gamesmanuni-full.mp4 --board-size 4 --benchmark"
+else
+    echo "⚠ Skipping allocation benchmark - file not found"
+fi
+
+# Chunked processing must reproduce the sequential move list
+check_chunks() {
+    local video="uploads/export-othello-gamesmanuni-full.mp4"
+    for chunks in 1 3; do
+        python3 othello_demo.py --video "$video" --board-size 4 --skip-frames 5 --json \
+            --chunks $chunks --output "$TEST_OUTPUT_DIR/test_chunks_$chunks" || return 1
+    done
+    python3 - "$TEST_OUTPUT_DIR"/test_chunks_{1,3}/export-othello-gamesmanuni-full_result.json <<'EOF'
+import sys
+import json
+
+sequential, chunked = [json.load(open(path))['moves'] for path in sys.argv[1:]]
+assert sequential, "no moves detected"
+assert chunked == sequential, f"--chunks 3 gave {chunked}, --chunks 1 gave {sequential}"
+print(f"{len(sequential)} moves match")
+EOF
+}
+
+if [ -f "uploads/export-othello-gamesmanuni-full.mp4" ]; then
+    run_test "Chunked Video - Matches Sequential Moves" "check_chunks"
+else
+    echo "⚠ Skipping chunked video test - file not found"
+fi
+
 if [ -f "uploads/input-othello-real-world.mov" ]; then
     run_test "Real World Video - 8x8" \
         "python3 othello_demo.py --video uploads/input-othello-real-world.mov --board-size 8 --json --output $TEST_OUTPUT_DIR/test_real_world"
@@ -139,6 +170,77 @@ fi
 
 echo ""
 
+# ========================================
+# Storage Format Tests
+# ========================================
+echo "========================================"
+echo "Testing Storage Formats"
+echo "========================================"
+echo ""
+
+# Round-trips varints and game records, including appends and recovery
+# from an append that was interrupted before close()
+check_records() {
+    python3 - "$TEST_OUTPUT_DIR/test_records.othr" <<'EOF'
+import os
+import sys
+import numpy as np
+from othello_records import RecordWriter, RecordReader, _encode_varints, _decode_varints
+
+values = [0, 1, 127, 128, 300, 16383, 16384, 2**32 - 1, 2**40 + 5]
+decoded = _decode_varints(np.frombuffer(_encode_varints(values), dtype=np.uint8))
+assert decoded.tolist() == values, decoded
+
+def game(states, frames):
+    moves = [{"player": i % 2 + 1, "state": s, "frame": f} for i, (s, f) in enumerate(zip(states, frames))]
+    return {"board_size": 4, "moves": moves, "total_moves": len(moves), "total_frames": frames[-1] + 1}
+
+first = game(["-----BW--WB-----", "-----BW--BB--B--"], [0, 180])
+second = game(["-----BW--WB-WB--"], [340])
+third = game(["W-WBWWB-WWBBWBW-"], [2**20])
+
+path = sys.argv[1]
+if os.path.exists(path):
+    os.remove(path)
+with RecordWriter(path, 4, parameters={"skip_frames": 20}) as writer:
+    writer.write_game(first)
+with RecordWriter(path, 4, parameters={"skip_frames": 20}, append=True) as writer:
+    writer.write_game(second)
+
+# Interrupted append: records written, no index or footer
+writer = RecordWriter(path, 4, parameters={"skip_frames": 5}, append=True)
+writer.write_game(third)
+writer.file.close()
+
+with RecordReader(path) as reader:
+    assert len(reader) == 2, len(reader)
+    assert reader.read_game(0)["moves"] == first["moves"]
+    assert reader.read_game(1)["moves"] == second["moves"]
+
+with RecordWriter(path, 4, parameters={"skip_frames": 5}, append=True) as writer:
+    writer.write_game(third)
+
+with RecordReader(path) as reader:
+    assert len(reader) == 3 and reader.end == os.path.getsize(path)
+    stored = reader.read_game(2)
+    assert stored["moves"] == third["moves"] and stored["parameters"] == {"skip_frames": 5}
+    assert "parameters" not in reader.read_game(0)
+    arrays = reader.load_arrays()
+    assert arrays["frames"].tolist() == [0, 180, 340, 2**20]
+    assert arrays["game_offsets"].tolist() == [0, 2, 3, 4]
+
+try:
+    reader.read_game(0)
+except ValueError:
+    pass
+else:
+    raise AssertionError("closed reader did not raise")
+print("Game records round-trip OK")
+EOF
+}
+
+run_test "Game Records - Round Trip, Append and Recovery" "check_records"
+
 # ========================================
 # Test Summary
 # ========================================